@@ -0,0 +1,109 @@
+import mimetypes
+import mmap
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    """Сильный ETag из inode, размера и времени изменения в наносекундах."""
+    return quote_etag(f'{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}')
+
+
+def parse_range(header, size):
+    """Один диапазон из заголовка Range: (начало, конец включительно).
+
+    None - заголовок не разобран, и отдаётся весь файл. Пустой кортеж -
+    диапазон за пределами файла.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        length = int(end)
+        if not length:
+            return ()
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return ()
+    return start, end
+
+
+def mmap_chunks(full_path, start, end):
+    """Срез файла кусками из mmap: без read() и буферов файла."""
+    with open(full_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(start, end + 1, CHUNK_SIZE):
+                yield mapped[offset:min(offset + CHUNK_SIZE, end + 1)]
+
+
+def wants_range(request, etag):
+    if 'HTTP_RANGE' not in request.META:
+        return False
+    if_range = request.META.get('HTTP_IF_RANGE')
+    return if_range is None or etag in parse_etags(if_range)
+
+
+def file_response(request, full_path, offload_path=None, encoding=None,
+                  content_type=None):
+    """Ответ с файлом: 304 по ETag, Range, либо отдача через прокси.
+
+    offload_path - внутренний адрес файла для X-Accel-Redirect, его
+    передают только для файлов, которые разрешено отдавать прокси.
+    Целиком файл уходит через FileResponse: сервер приложения может
+    отправить его через wsgi.file_wrapper и sendfile.
+    """
+    stat = os.stat(full_path)
+    etag = file_etag(stat)
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        response['ETag'] = etag
+        return response
+    offload = settings.MEDIA_OFFLOAD if offload_path else None
+    span = None
+    if not offload and stat.st_size and wants_range(request, etag):
+        span = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+        if span == ():
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+    if offload == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = offload_path
+    elif offload == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    elif span:
+        start, end = span
+        response = StreamingHttpResponse(
+            mmap_chunks(full_path, start, end),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,58 @@
+import multiprocessing
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import work
+
+
+def worker_main(batch_size, sleep, once):
+    django.setup()
+    work(batch_size, sleep, once)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики фоновых задач из очереди в базе'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASKS_WORKERS,
+            help='Число процессов-обработчиков'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASKS_BATCH_SIZE,
+            help='Сколько задач забирать за один запрос'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=settings.TASKS_IDLE_SLEEP,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда очередь опустеет'
+        )
+
+    def handle(self, *args, **options):
+        worker_args = (
+            options['batch_size'], options['sleep'], options['once'])
+        if options['processes'] <= 1:
+            work(*worker_args)
+            return
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=worker_main, args=worker_args)
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Запущено обработчиков: {len(workers)}')
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+                worker.join()
@@ -0,0 +1,101 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TARGETS = {
+    'setup': 'import django; django.setup()',
+    'wsgi': 'import yatube.wsgi',
+    'urls': (
+        'import django; django.setup(); '
+        'from django.urls import get_resolver; get_resolver().url_patterns'
+    ),
+}
+PREFIX = 'import time:'
+
+
+def parse_importtime(output):
+    """Строки -X importtime: (модуль, своё время, общее время, глубина)."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith(PREFIX):
+            continue
+        own, cumulative, name = line[len(PREFIX):].split('|')
+        if not own.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(own), int(cumulative), depth))
+    return rows
+
+
+def by_package(rows):
+    totals = Counter()
+    for name, own, _, _ in rows:
+        totals[name.split('.')[0]] += own
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Показывает, на что уходит время запуска приложения'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', choices=sorted(TARGETS), default='wsgi',
+            help='Что импортировать: django.setup, wsgi или ещё и urls'
+        )
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз запустить процесс для замера времени'
+        )
+
+    def handle(self, *args, **options):
+        code = TARGETS[options['target']]
+        timings = []
+        output = ''
+        for _ in range(max(options['repeat'], 1)):
+            start = time.perf_counter()
+            output = self.run(code)
+            timings.append((time.perf_counter() - start) * 1000)
+        rows = parse_importtime(output)
+        total = sum(cumulative for _, _, cumulative, depth in rows
+                    if depth == 0)
+        self.stdout.write(
+            f'Запуск {options["target"]}: медиана '
+            f'{statistics.median(timings):.1f} мс, лучший '
+            f'{min(timings):.1f} мс, импорт {total / 1000:.1f} мс, '
+            f'модулей {len(rows)}'
+        )
+        self.stdout.write('\nПакеты по собственному времени:')
+        for package, own in by_package(rows).most_common(options['top']):
+            self.stdout.write(f'{own / 1000:9.1f} мс  {package}')
+        index = 1 if options['sort'] == 'self' else 2
+        self.stdout.write(f'\nМодули по {options["sort"]}:')
+        rows.sort(key=lambda row: row[index], reverse=True)
+        for name, own, cumulative, _ in rows[:options['top']]:
+            self.stdout.write(
+                f'{own / 1000:9.1f} {cumulative / 1000:9.1f} мс  {name}')
+
+    def run(self, code):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        if result.returncode:
+            lines = result.stderr.strip().splitlines() or ['нет вывода']
+            raise CommandError(lines[-1])
+        return result.stderr
@@ -0,0 +1,230 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+STALE_KEY = 'admission:stale:{}:{}'
+BUCKET_KEY = 'ratelimit:{}:{}'
+USER_CACHE_KEY = 'auth:user:{}'
+BUCKET_TIMEOUT = 60 * 60
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+STATS = {}
+STATS_LOCK = threading.Lock()
+
+
+def stats_for(view_class):
+    return STATS.setdefault(view_class, dict.fromkeys(
+        ('limit', 'in_flight', 'admitted', 'shed', 'stale'), 0))
+
+
+def count(view_class, field, delta=1):
+    with STATS_LOCK:
+        stats_for(view_class)[field] += delta
+
+
+class AdmissionControlMiddleware:
+    """Ограничивает число одновременных тяжёлых запросов в воркере.
+
+    Представления разбиты на классы в ADMISSION_VIEW_CLASSES, у каждого
+    класса свой лимит в ADMISSION_LIMITS. Запрос ждёт места не дольше
+    ADMISSION_QUEUE_TIMEOUT, после чего получает сохранённую копию
+    страницы или быстрый 503 с Retry-After.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_classes = settings.ADMISSION_VIEW_CLASSES
+        self.gates = {}
+        for view_class, limit in settings.ADMISSION_LIMITS.items():
+            self.gates[view_class] = threading.BoundedSemaphore(limit)
+            with STATS_LOCK:
+                stats_for(view_class)['limit'] = limit
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            view_class = getattr(request, 'admission_class', None)
+            if view_class is not None:
+                self.gates[view_class].release()
+                count(view_class, 'in_flight', -1)
+        if view_class is not None and self.is_cacheable(request, response):
+            cache.set(
+                self.stale_key(request),
+                (response.content, response['Content-Type']),
+                settings.ADMISSION_STALE_TIMEOUT
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = self.view_classes.get(request.resolver_match.view_name)
+        if view_class not in self.gates:
+            return None
+        gate = self.gates[view_class]
+        if not gate.acquire(timeout=settings.ADMISSION_QUEUE_TIMEOUT):
+            return self.shed(request, view_class)
+        request.admission_class = view_class
+        count(view_class, 'in_flight')
+        count(view_class, 'admitted')
+        return None
+
+    def stale_key(self, request):
+        return STALE_KEY.format(request.user.pk, request.get_full_path())
+
+    def is_cacheable(self, request, response):
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+        )
+
+    def shed(self, request, view_class):
+        stale = None
+        if request.method == 'GET':
+            stale = cache.get(self.stale_key(request))
+        if stale is not None:
+            count(view_class, 'stale')
+            content, content_type = stale
+            response = HttpResponse(content, content_type=content_type)
+            response['Warning'] = '110 - "Response is Stale"'
+            return response
+        count(view_class, 'shed')
+        response = HttpResponse(
+            'Сервер перегружен, попробуйте позже',
+            content_type='text/plain; charset=utf-8',
+            status=503
+        )
+        response['Retry-After'] = str(settings.ADMISSION_RETRY_AFTER)
+        return response
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): размер корзины и время её полного наполнения."""
+    capacity, period = rate.split('/')
+    return int(capacity), PERIODS[period]
+
+
+def take_token(key, capacity, period, now=None):
+    """Забирает жетон из корзины, возвращает секунды до следующего.
+
+    Корзина хранится двумя ключами: счётчик потраченных жетонов, который
+    меняется атомарным incr, и время начала отсчёта. Доступно жетонов
+    capacity + наполнение с начала отсчёта - потрачено. Когда корзина
+    успела наполниться до краёв, отсчёт начинается заново, поэтому
+    счётчики остаются маленькими и не копят лишний запас. Отказ жетон
+    не тратит.
+    """
+    now = time.time() if now is None else now
+    rate = capacity / period
+    start_key = f'{key}:start'
+    count_key = f'{key}:count'
+    timeout = max(BUCKET_TIMEOUT, 2 * period)
+    try:
+        spent = cache.incr(count_key)
+    except ValueError:
+        spent = None
+    start = cache.get(start_key)
+    if spent is None or start is None or (now - start) * rate >= spent - 1:
+        cache.set_many({start_key: now, count_key: 1}, timeout)
+        return 0
+    missing = spent - capacity - (now - start) * rate
+    if missing <= 0:
+        return 0
+    cache.decr(count_key)
+    return math.ceil(missing / rate)
+
+
+class RateLimitMiddleware:
+    """Ограничивает частоту запросов к представлениям из RATELIMITS.
+
+    Авторизованные пользователи получают свою корзину, анонимные делят
+    корзину по IP-адресу. Безопасные методы не ограничиваются, кроме
+    представлений из RATELIMIT_GET_VIEWS, которые пишут и на GET.
+    Состояние лежит в кэше, к базе запросов нет.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rates = {
+            view_name: parse_rate(rate)
+            for view_name, rate in settings.RATELIMITS.items()
+        }
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        if view_name not in self.rates:
+            return None
+        if (request.method in SAFE_METHODS
+                and view_name not in settings.RATELIMIT_GET_VIEWS):
+            return None
+        if request.user.is_authenticated:
+            client = f'user:{request.user.pk}'
+        else:
+            client = f'ip:{request.META.get("REMOTE_ADDR")}'
+        retry_after = take_token(
+            BUCKET_KEY.format(view_name, client), *self.rates[view_name])
+        if not retry_after:
+            return None
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже',
+            content_type='text/plain; charset=utf-8',
+            status=429
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+
+def load_user(request):
+    """Пользователь сессии из кэша, из базы - только при промахе.
+
+    Проверки те же, что в auth.get_user: бэкенд из настроек и хеш
+    пароля в сессии, поэтому смена пароля разлогинивает как обычно.
+    """
+    user_id = request.session.get(auth.SESSION_KEY)
+    backend_path = request.session.get(auth.BACKEND_SESSION_KEY)
+    if user_id is None or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    key = USER_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(
+            session_hash, user.get_session_auth_hash()):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+def forget_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = load_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, который берёт пользователя из кэша."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: cached_user(request))
@@ -0,0 +1,55 @@
+import gzip
+import io
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map')
+
+
+def gzip_bytes(data):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+            fileobj=buffer, mode='wb', compresslevel=9, mtime=0) as file:
+        file.write(data)
+    return buffer.getvalue()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хешированные имена статики и готовые .gz рядом с ними.
+
+    Пока collectstatic не запускали и манифеста нет, отдаёт обычные
+    имена файлов, чтобы разработка и тесты работали без сборки.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def is_immutable(self, name):
+        return name in self.hashed_files.values()
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if isinstance(hashed_name, str):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(COMPRESSIBLE):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        compressed = gzip_bytes(data)
+        if len(compressed) >= len(data):
+            return
+        gzip_name = f'{name}.gz'
+        if self.exists(gzip_name):
+            self.delete(gzip_name)
+        self._save(gzip_name, ContentFile(compressed))
@@ -0,0 +1,165 @@
+import json
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+REGISTRY = {}
+
+RETURNING_COLUMNS = ('id', 'name', 'payload', 'attempts', 'max_attempts')
+
+
+def task(func=None, *, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    У функции появляется delay(*args, dedup_key=None, countdown=0,
+    **kwargs), который ставит вызов в очередь.
+    """
+    def register(func):
+        name = f'{func.__module__}.{func.__name__}'
+        REGISTRY[name] = func
+
+        def delay(*args, **kwargs):
+            kwargs.setdefault('max_attempts', max_attempts)
+            return enqueue(name, *args, **kwargs)
+
+        func.task_name = name
+        func.delay = delay
+        return func
+
+    if func is None:
+        return register
+    return register(func)
+
+
+def get_task(name):
+    if name not in REGISTRY:
+        import_string(name)
+    return REGISTRY[name]
+
+
+def enqueue(name, *args, dedup_key=None, countdown=0, max_attempts=None,
+            **kwargs):
+    """Ставит задачу в очередь одним INSERT.
+
+    Если задача с тем же dedup_key ещё ждёт, новая не добавляется.
+    Взятая в работу задача ключ отпускает: изменения, пришедшие во
+    время её выполнения, поставят задачу заново.
+    """
+    payload = json.dumps(
+        {'args': args, 'kwargs': kwargs}, cls=DjangoJSONEncoder)
+    Task.objects.bulk_create([Task(
+        name=name,
+        payload=payload,
+        dedup_key=dedup_key,
+        run_at=timezone.now() + timedelta(seconds=countdown),
+        max_attempts=max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    )], ignore_conflicts=True)
+
+
+def can_return_rows(connection):
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35, 0)
+    return connection.vendor == 'postgresql'
+
+
+def claim(batch_size, now=None):
+    """Забирает пачку готовых задач и помечает их своим токеном.
+
+    Задачи, чья аренда истекла (обработчик упал), забираются снова.
+    Где база умеет UPDATE ... RETURNING, хватает одного запроса,
+    иначе пачка размечается токеном и читается вторым запросом.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    expired = now - timedelta(seconds=settings.TASKS_LEASE)
+    ready = Task.objects.filter(
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, claimed_at__lt=expired)
+    ).order_by('run_at').values('pk')[:batch_size]
+    connection = connections[Task.objects.db]
+    with transaction.atomic(using=connection.alias):
+        ready = ready.select_for_update(skip_locked=True)
+        if not can_return_rows(connection):
+            Task.objects.filter(pk__in=ready).update(
+                status=Task.RUNNING,
+                claimed_by=token,
+                claimed_at=now,
+                attempts=F('attempts') + 1,
+                dedup_key=None,
+            )
+            return list(Task.objects.filter(
+                claimed_by=token).values_list(*RETURNING_COLUMNS))
+        sql, params = ready.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Task._meta.db_table} '
+                'SET status = %s, claimed_by = %s, claimed_at = %s, '
+                'attempts = attempts + 1, dedup_key = NULL '
+                f'WHERE id IN ({sql}) '
+                f'RETURNING {", ".join(RETURNING_COLUMNS)}',
+                [
+                    Task.RUNNING,
+                    token,
+                    connection.ops.adapt_datetimefield_value(now),
+                    *params,
+                ]
+            )
+            return cursor.fetchall()
+
+
+def fail(pk, attempts, max_attempts, error, now=None):
+    """Откладывает задачу с экспоненциальной паузой или бросает её."""
+    tasks = Task.objects.filter(pk=pk)
+    if attempts >= max_attempts:
+        tasks.update(status=Task.FAILED, last_error=error)
+        return
+    now = now or timezone.now()
+    delay = settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1)
+    tasks.update(
+        status=Task.QUEUED,
+        run_at=now + timedelta(seconds=delay),
+        claimed_by='',
+        last_error=error,
+    )
+
+
+def run_batch(batch_size=None):
+    """Выполняет одну пачку задач, возвращает число взятых задач.
+
+    Выполненные задачи удаляются одним запросом в конце пачки.
+    """
+    rows = claim(batch_size or settings.TASKS_BATCH_SIZE)
+    done = []
+    for pk, name, payload, attempts, max_attempts in rows:
+        try:
+            data = json.loads(payload)
+            get_task(name)(*data['args'], **data['kwargs'])
+        except Exception:
+            fail(pk, attempts, max_attempts, traceback.format_exc())
+        else:
+            done.append(pk)
+    if done:
+        finished = Task.objects.filter(pk__in=done)
+        finished._raw_delete(finished.db)
+    return len(rows)
+
+
+def work(batch_size=None, sleep=None, once=False):
+    """Цикл обработчика; с once=True выходит, когда очередь пуста."""
+    sleep = settings.TASKS_IDLE_SLEEP if sleep is None else sleep
+    while True:
+        if run_batch(batch_size):
+            continue
+        if once:
+            return
+        time.sleep(sleep)
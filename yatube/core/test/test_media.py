@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = b'0123456789abcdef'
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaServingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'))
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'a.txt'), 'wb') as f:
+            f.write(CONTENT)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'secret.txt'), 'wb') as f:
+            f.write(CONTENT)
+        cls.url = f'{settings.MEDIA_URL}posts/a.txt'
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_full_file_and_etag(self):
+        """Файл отдаётся целиком с ETag, повтор с ETag получает 304."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        """Range отдаёт кусок файла, If-Range с чужим ETag - весь файл."""
+        cases = {
+            'bytes=2-5': b'2345',
+            'bytes=12-': b'cdef',
+            'bytes=-3': b'def',
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(
+                    b''.join(response.streaming_content), expected)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_only_allowed_folders(self):
+        """Файлы вне разрешённых папок и выход из MEDIA_ROOT - 404."""
+        for path in ('secret.txt', 'posts/../secret.txt', 'posts/none.txt'):
+            with self.subTest(path=path):
+                response = self.client.get(f'{settings.MEDIA_URL}{path}')
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect')
+    def test_offload(self):
+        """С MEDIA_OFFLOAD файл отдаёт прокси по внутреннему адресу."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            f'{settings.MEDIA_ACCEL_PREFIX}posts/a.txt'
+        )
@@ -0,0 +1,147 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import STATS, USER_CACHE_KEY, take_token
+
+User = get_user_model()
+
+
+class AdmissionControlTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.url = reverse('posts:profile', args=[cls.user.username])
+
+    def setUp(self):
+        cache.clear()
+        STATS.clear()
+
+    @override_settings(ADMISSION_LIMITS={'feeds': 0},
+                       ADMISSION_QUEUE_TIMEOUT=0)
+    def test_shed_without_stale_copy(self):
+        """При нехватке мест без копии страницы отдаётся 503."""
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertEqual(STATS['feeds']['shed'], 1)
+
+    def test_shed_serves_stale_copy(self):
+        """При нехватке мест отдаётся последняя удачная копия."""
+        fresh = Client().get(self.url)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(STATS['feeds']['in_flight'], 0)
+        with self.settings(ADMISSION_LIMITS={'feeds': 0},
+                           ADMISSION_QUEUE_TIMEOUT=0):
+            response = Client().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Warning', response)
+        self.assertEqual(response.content, fresh.content)
+        self.assertEqual(STATS['feeds']['stale'], 1)
+
+    def test_other_views_are_not_limited(self):
+        """Представления без класса не ограничиваются."""
+        with self.settings(ADMISSION_LIMITS={'feeds': 0},
+                           ADMISSION_QUEUE_TIMEOUT=0):
+            response = Client().get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics(self):
+        """Метрики доступны только с разрешённых адресов."""
+        Client().get(self.url)
+        response = Client().get('/metrics/')
+        self.assertContains(
+            response, 'yatube_admission_admitted{class="feeds"} 1')
+        response = Client(REMOTE_ADDR='10.0.0.1').get('/metrics/')
+        self.assertEqual(response.status_code, 404)
+
+
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bucket_refills(self):
+        """Корзина пустеет за capacity запросов и наполняется со временем."""
+        for _ in range(3):
+            self.assertEqual(take_token('bucket', 3, 60, now=100), 0)
+        self.assertEqual(take_token('bucket', 3, 60, now=100), 20)
+        self.assertEqual(take_token('bucket', 3, 60, now=110), 10)
+        self.assertEqual(take_token('bucket', 3, 60, now=120), 0)
+        self.assertEqual(take_token('bucket', 3, 60, now=121), 19)
+
+    def test_bucket_does_not_overflow(self):
+        """Долгий простой не даёт больше capacity жетонов."""
+        take_token('bucket', 2, 60, now=0)
+        for _ in range(2):
+            self.assertEqual(take_token('bucket', 2, 60, now=1000), 0)
+        self.assertNotEqual(take_token('bucket', 2, 60, now=1000), 0)
+
+    @override_settings(RATELIMITS={'users:signup': '2/m'})
+    def test_view_is_limited_per_client(self):
+        """Лишний запрос получает 429, другой адрес не ограничен."""
+        url = reverse('users:signup')
+        client = Client()
+        for _ in range(2):
+            self.assertEqual(client.post(url).status_code, 200)
+        response = client.post(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        other = Client(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other.post(url).status_code, 200)
+
+    @override_settings(RATELIMITS={'users:signup': '2/m'})
+    def test_safe_methods_not_limited(self):
+        """Открытие формы не тратит жетоны записи."""
+        url = reverse('users:signup')
+        client = Client()
+        for _ in range(3):
+            self.assertEqual(client.get(url).status_code, 200)
+        self.assertEqual(client.post(url).status_code, 200)
+
+    @override_settings(RATELIMITS={'posts:profile_follow': '1/m'})
+    def test_get_writes_are_limited(self):
+        """Подписка по ссылке пишет на GET и ограничивается."""
+        author = User.objects.create_user(username='author')
+        client = Client()
+        client.force_login(User.objects.create_user(username='reader'))
+        url = reverse('posts:profile_follow', args=[author.username])
+        self.assertEqual(client.get(url).status_code, 302)
+        self.assertEqual(client.get(url).status_code, 429)
+
+
+class CachedAuthenticationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('about:author')
+
+    def test_no_auth_queries_in_steady_state(self):
+        """Повторный запрос не читает ни сессию, ни пользователя."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], self.user)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_logs_out(self):
+        """После смены пароля старая сессия больше не действует."""
+        self.client.get(self.url)
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_forgets_user(self):
+        """Выход удаляет пользователя из кэша."""
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(USER_CACHE_KEY.format(self.user.pk)))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(USER_CACHE_KEY.format(self.user.pk)))
@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.management.commands.startup_report import (by_package,
+                                                     parse_importtime)
+
+OUTPUT = '''import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   PIL._util
+import time:       300 |        420 | PIL
+import time:        50 |         50 |     django.utils.version
+import time:       200 |        250 |   django.utils
+import time:       100 |        350 | django
+'''
+
+
+class StartupReportTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        """Разбор вывода -X importtime с глубиной вложенности."""
+        rows = parse_importtime(OUTPUT)
+        self.assertEqual(rows[0], ('PIL._util', 120, 120, 1))
+        self.assertEqual(rows[2], ('django.utils.version', 50, 50, 2))
+        self.assertEqual(rows[-1], ('django', 100, 350, 0))
+        self.assertEqual(by_package(rows), {'PIL': 420, 'django': 350})
+
+    def test_wsgi_startup_skips_pillow(self):
+        """Запуск WSGI не импортирует Pillow и admin.py приложений."""
+        out = StringIO()
+        call_command('startup_report', '--repeat', '1', '--top', '1000',
+                     stdout=out)
+        report = out.getvalue()
+        self.assertIn('Запуск wsgi', report)
+        self.assertNotIn(' PIL', report)
+        self.assertNotIn('posts.admin', report)
+        self.assertNotIn('users.admin', report)
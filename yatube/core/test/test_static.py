@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import Client, TestCase, override_settings
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class CollectedStaticTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def test_hashed_names_and_gzip(self):
+        """collectstatic пишет хешированные имена и .gz рядом с ними."""
+        url = static('css/bootstrap.min.css')
+        self.assertNotEqual(url, '/static/css/bootstrap.min.css')
+        hashed_name = url[len(settings.STATIC_URL):]
+        self.assertTrue(staticfiles_storage.exists(hashed_name))
+        self.assertTrue(staticfiles_storage.exists(f'{hashed_name}.gz'))
+        self.assertFalse(staticfiles_storage.exists(
+            f'{static("img/logo.png")[len(settings.STATIC_URL):]}.gz'))
+
+    def test_serve_gzip_immutable(self):
+        """Хешированный файл отдаётся сжатым и кэшируется навсегда."""
+        url = static('css/bootstrap.min.css')
+        response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_serve_plain(self):
+        """Без gzip в Accept-Encoding отдаётся исходный файл."""
+        response = Client().get(static('css/bootstrap.min.css'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertTrue(b''.join(response.streaming_content))
+        response = Client().get('/static/css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(Client().get('/static/nope.css').status_code, 404)
+
+
+@override_settings(STATIC_ROOT=f'{TEMP_STATIC_ROOT}-empty')
+class UncollectedStaticTest(TestCase):
+    def test_plain_names_without_manifest(self):
+        """Без манифеста шаблоны получают обычные имена файлов."""
+        self.assertEqual(
+            static('css/bootstrap.min.css'), '/static/css/bootstrap.min.css')
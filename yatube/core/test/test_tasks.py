@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from core.models import Task
+from core.tasks import claim, enqueue, run_batch, task
+
+CALLS = []
+
+
+@task
+def remember(value, extra=None):
+    CALLS.append((value, extra))
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_tasks_run_and_are_deleted(self):
+        """Задачи выполняются пачкой и удаляются из очереди."""
+        for value in range(3):
+            remember.delay(value, extra='x')
+        self.assertEqual(run_batch(), 3)
+        self.assertEqual(sorted(CALLS), [(0, 'x'), (1, 'x'), (2, 'x')])
+        self.assertFalse(Task.objects.exists())
+
+    def test_claim_without_returning(self):
+        """Без UPDATE ... RETURNING задачи забираются по токену."""
+        remember.delay(1)
+        with mock.patch('core.tasks.can_return_rows', return_value=False):
+            self.assertEqual(run_batch(), 1)
+        self.assertEqual(CALLS, [(1, None)])
+        self.assertFalse(Task.objects.exists())
+
+    def test_dedup_key(self):
+        """Ждущая задача с тем же ключом не дублируется."""
+        remember.delay(1, dedup_key='same')
+        remember.delay(2, dedup_key='same')
+        self.assertEqual(Task.objects.count(), 1)
+        run_batch()
+        self.assertEqual(CALLS, [(1, None)])
+        remember.delay(3, dedup_key='same')
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_dedup_key_released_on_claim(self):
+        """Задача с ключом, поставленная во время выполнения, не теряется."""
+        remember.delay(1, dedup_key='same')
+        claim(10)
+        remember.delay(2, dedup_key='same')
+        self.assertEqual(
+            Task.objects.filter(status=Task.QUEUED).count(), 1)
+
+    def test_countdown(self):
+        """Отложенная задача не берётся раньше срока."""
+        enqueue(remember.task_name, 1, countdown=60)
+        self.assertEqual(run_batch(), 0)
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача откладывается, потом помечается ошибкой."""
+        explode.delay(dedup_key='explode')
+        run_batch()
+        queued = Task.objects.get()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('boom', queued.last_error)
+        Task.objects.update(run_at=queued.run_at.replace(year=2000))
+        run_batch()
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.FAILED)
+        self.assertIsNone(failed.dedup_key)
+
+    @override_settings(
+        EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+        TASKS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+    )
+    def test_queued_email(self):
+        """Письмо уходит из обработчика, а не из запроса."""
+        mail.send_mail('Тема', 'Текст', 'from@test.ru', ['to@test.ru'])
+        self.assertEqual(len(mail.outbox), 0)
+        run_batch()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['to@test.ru'])
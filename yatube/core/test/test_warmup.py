@@ -0,0 +1,27 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from yatube import warmup
+
+
+class WarmupTest(TransactionTestCase):
+    databases = '__all__'
+
+    def test_compile_templates(self):
+        """Все шаблоны проекта компилируются без ошибок."""
+        names = list(
+            warmup.template_names(settings.TEMPLATES[0]['DIRS'][0]))
+        self.assertIn('posts/index.html', names)
+        self.assertEqual(warmup.compile_templates(), len(names))
+
+    def test_resolver_and_database(self):
+        """Маршруты готовы, соединение с базой закрыто перед форком."""
+        resolver = warmup.build_resolver()
+        self.assertIn('posts', resolver.namespace_dict)
+        self.assertEqual(reverse('posts:index'), '/')
+        with mock.patch.object(warmup.connections, 'close_all') as close:
+            warmup.touch_database()
+        close.assert_called_once_with()
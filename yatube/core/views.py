@@ -1,4 +1,18 @@
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .files import file_response
+from .middleware import STATS, STATS_LOCK
 
 
 def page_not_found(request, exception):
@@ -15,3 +29,73 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def metrics(request):
+    """Счётчики контроля нагрузки в текстовом формате Prometheus."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    lines = []
+    with STATS_LOCK:
+        for view_class, stats in sorted(STATS.items()):
+            for field, value in stats.items():
+                lines.append(
+                    f'yatube_admission_{field}{{class="{view_class}"}} '
+                    f'{value}'
+                )
+    return HttpResponse(
+        '\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4')
+
+
+@require_safe
+def serve_static(request, path):
+    """Отдаёт собранную статику, по возможности готовым .gz.
+
+    Файлы с хешем в имени никогда не меняются и кэшируются навсегда.
+    """
+    try:
+        full_path = staticfiles_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(full_path)
+    encoding = None
+    accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if accepts_gzip and os.path.isfile(f'{full_path}.gz'):
+        full_path = f'{full_path}.gz'
+        encoding = 'gzip'
+    response = file_response(
+        request, full_path, encoding=encoding, content_type=content_type)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if staticfiles_storage.is_immutable(path):
+        patch_cache_control(
+            response, public=True, immutable=True,
+            max_age=settings.STATIC_MAX_AGE
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=60)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт загруженные файлы из разрешённых папок MEDIA_ROOT.
+
+    С MEDIA_OFFLOAD сам файл отдаёт прокси, здесь только проверка.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    if not path.startswith(settings.MEDIA_ALLOWED_PREFIXES):
+        raise Http404
+    try:
+        full_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    response = file_response(
+        request, full_path,
+        offload_path=settings.MEDIA_ACCEL_PREFIX + path
+    )
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE)
+    return response
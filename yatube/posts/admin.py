@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from .deletion import request_group_deletion
 from .models import Group, Post, Comment, Follow
 
 
@@ -16,6 +17,14 @@ class GroupAdmin(admin.ModelAdmin):
     search_fields = ('descriptions',)
     list_filter = ('slug',)
     empty_value_display = '-пусто-'
+    actions = ('soft_delete',)
+
+    def soft_delete(self, request, queryset):
+        for group in queryset:
+            request_group_deletion(group)
+        self.message_user(
+            request, 'Посты групп будут отвязаны командой purge_deleted')
+    soft_delete.short_description = 'Удалить в фоне'
 
 
 class CommentAdmin(admin.ModelAdmin):
@@ -0,0 +1,146 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from .archive import archive_enabled, archived_posts
+from .cards import PostCard, card_rows
+from .models import ArchivedComment, Comment, Group, Post
+from .pagination import cursor_page
+from .sharding import (followed_post_querysets, post_querysets,
+                       shard_for_author, shard_for_post)
+
+User = get_user_model()
+
+POST_FIELDS = ('id', 'pub_date', 'text', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'created', 'text', 'author_id')
+
+
+def encode(value):
+    return json.dumps(
+        value, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+
+
+def is_compact(request):
+    return request.GET.get('fields') == 'compact'
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        size = settings.API_PAGE_SIZE
+    return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+
+def resolve_names(rows):
+    """Заменяет id автора и группы на username и slug двумя запросами."""
+    author_ids = {row['author_id'] for row in rows}
+    group_ids = {row['group_id'] for row in rows if row.get('group_id')}
+    usernames = dict(User.objects.filter(
+        pk__in=author_ids).values_list('pk', 'username'))
+    slugs = dict(Group.objects.filter(
+        pk__in=group_ids).values_list('pk', 'slug'))
+    for row in rows:
+        row['author'] = usernames.get(row.pop('author_id'))
+        if 'group_id' in row:
+            row['group'] = slugs.get(row.pop('group_id'))
+        if 'image' in row:
+            row['image'] = (
+                default_storage.url(row['image']) if row['image'] else None)
+    return rows
+
+
+def json_page(request, rows, next_cursor, **extra):
+    """Страница API целиком: размер ограничен API_MAX_PAGE_SIZE.
+
+    ETag считается по готовому телу, поэтому 304 отдаётся без отправки
+    страницы, но после её сборки.
+    """
+    resolve_names(rows + list(extra.values()))
+    body = b''.join([
+        b'{',
+        *(encode(key) + b':' + encode(value) + b','
+          for key, value in extra.items()),
+        b'"results":[',
+        b','.join(encode(row) for row in rows),
+        b'],"next":',
+        encode(next_cursor),
+        b'}',
+    ])
+    etag = quote_etag(hashlib.md5(body).hexdigest())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            body, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    return response
+
+
+def feed_response(request, querysets):
+    compact = is_compact(request)
+    cards, next_cursor = cursor_page(
+        [card_rows(queryset, compact) for queryset in querysets],
+        request.GET.get('cursor'),
+        page_size(request),
+        build=PostCard.from_row
+    )
+    rows = [card.as_dict(compact) for card in cards]
+    return json_page(request, rows, next_cursor)
+
+
+@require_GET
+def api_index(request):
+    return feed_response(request, post_querysets())
+
+
+@require_GET
+def api_group(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, post_querysets(group_id=group.pk))
+
+
+@require_GET
+def api_profile(request, username):
+    author = get_object_or_404(User, username=username)
+    querysets = post_querysets(
+        [shard_for_author(author.pk)], author_id=author.pk)
+    return feed_response(request, querysets)
+
+
+@require_GET
+def api_follow(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Требуется авторизация'}, status=401)
+    return feed_response(request, followed_post_querysets(request.user))
+
+
+@require_GET
+def api_post(request, post_id):
+    alias = shard_for_post(post_id) or DEFAULT_DB_ALIAS
+    post = Post.objects.using(alias).filter(
+        pk=post_id).values(*POST_FIELDS).first()
+    comments = Comment.objects.using(alias)
+    if post is None and archive_enabled():
+        post = archived_posts(pk=post_id).values(*POST_FIELDS).first()
+        comments = ArchivedComment.objects.using(archived_posts().db)
+    if post is None:
+        raise Http404
+    comments = comments.filter(post_id=post_id).values(*COMMENT_FIELDS)
+    rows, next_cursor = cursor_page(
+        comments,
+        request.GET.get('cursor'),
+        page_size(request),
+        field='created',
+        descending=False
+    )
+    return json_page(request, rows, next_cursor, post=post)
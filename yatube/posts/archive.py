@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import ArchivedPost
+
+
+def archive_enabled():
+    return settings.POSTS_ARCHIVE_AFTER is not None
+
+
+def archive_alias():
+    return settings.POSTS_ARCHIVE_DB or DEFAULT_DB_ALIAS
+
+
+def archived_posts(**filters):
+    return ArchivedPost.objects.using(archive_alias()).filter(**filters)
+
+
+def copy_to(model, instance):
+    """Копия строки в другой модели с теми же именами колонок."""
+    return model(**{
+        field.attname: getattr(instance, field.attname)
+        for field in type(instance)._meta.concrete_fields
+    })
@@ -0,0 +1,66 @@
+from functools import lru_cache
+
+from django.db.models.functions import Substr
+from django.urls import reverse
+
+EXCERPT_LENGTH = 140
+URL_PLACEHOLDER = 987654321
+FIELDS = ('id', 'pub_date', 'author_id', 'group_id')
+
+
+@lru_cache(maxsize=None)
+def post_url_template():
+    url = reverse('posts:post_detail', args=[URL_PLACEHOLDER])
+    return url.replace(str(URL_PLACEHOLDER), '{}')
+
+
+class PostCard:
+    """Пост для ленты без модели: только поля карточки и готовый адрес.
+
+    Строится из кортежа values_list. В компактном виде text хранит
+    отрывок, а картинки нет.
+    """
+
+    __slots__ = (
+        'id', 'pub_date', 'author_id', 'group_id', 'text', 'image', 'url')
+
+    def __init__(self, id, pub_date, author_id, group_id, text, image=None):
+        self.id = id
+        self.pub_date = pub_date
+        self.author_id = author_id
+        self.group_id = group_id
+        self.text = text
+        self.image = image
+        self.url = post_url_template().format(id)
+
+    @property
+    def pk(self):
+        return self.id
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def as_dict(self, compact=False):
+        row = {
+            'id': self.id,
+            'pub_date': self.pub_date,
+            'author_id': self.author_id,
+            'group_id': self.group_id,
+            'url': self.url,
+        }
+        if compact:
+            row['excerpt'] = self.text
+        else:
+            row['text'] = self.text
+            row['image'] = self.image
+        return row
+
+
+def card_rows(queryset, compact=False):
+    """Проекция выборки постов в кортежи для PostCard.from_row."""
+    if compact:
+        return queryset.annotate(
+            excerpt=Substr('text', 1, EXCERPT_LENGTH)
+        ).values_list(*FIELDS, 'excerpt')
+    return queryset.values_list(*FIELDS, 'text', 'image')
@@ -0,0 +1,117 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .archive import archive_enabled, archived_posts
+from .models import AuthorMarker, Group, GroupStats, LikeCounterShard, Post
+from .rendering import RENDER_VERSION
+from .sharding import is_sharded, shard_for_post
+
+
+def touch_authors(*author_ids):
+    """Отмечает изменение профилей авторов.
+
+    Отметка создаётся вместе с пользователем, здесь только UPDATE:
+    так сигналы при каскадном удалении не воскрешают её.
+    """
+    AuthorMarker.objects.filter(pk__in=set(filter(None, author_ids))).update(
+        changed_at=timezone.now())
+
+
+def touch_groups(*group_ids):
+    GroupStats.objects.filter(pk__in=set(filter(None, group_ids))).update(
+        changed_at=timezone.now())
+
+
+def author_changed_at(author_id):
+    return AuthorMarker.objects.filter(
+        pk=author_id).values_list('changed_at', flat=True).first()
+
+
+def post_changed_at(request, post_id):
+    """Когда менялся пост, его автор или лайки. Без шардов - одним запросом.
+
+    Части счётчика лайков лежат в базе поста, их время берётся
+    подзапросом. Пост из архива ищется, только если в горячей таблице
+    его нет.
+    """
+    row = None
+    liked_at = Subquery(LikeCounterShard.objects.filter(
+        post=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1])
+    if not is_sharded():
+        row = Post.objects.filter(pk=post_id).annotate(
+            liked_at=liked_at).values_list(
+            'updated_at', 'author__marker__changed_at', 'liked_at').first()
+    else:
+        alias = shard_for_post(post_id)
+        if alias is not None:
+            row = Post.objects.using(alias).filter(pk=post_id).annotate(
+                liked_at=liked_at).values_list(
+                'updated_at', 'author_id', 'liked_at').first()
+            if row is not None:
+                row = (row[0], author_changed_at(row[1]), row[2])
+    if row is None and archive_enabled():
+        row = archived_posts(pk=post_id).values_list(
+            'updated_at', 'author_id').first()
+        if row is not None:
+            row = (row[0], author_changed_at(row[1]))
+    if row is None:
+        return None
+    return max(moment for moment in row if moment is not None)
+
+
+def group_changed_at(request, slug):
+    return Group.objects.filter(slug=slug).values_list(
+        'stats__changed_at', flat=True).first()
+
+
+def page_etag(request, changed_at):
+    """ETag страницы: время изменения, зритель, адрес и версия шаблона.
+
+    Кука CSRF входит в ключ, чтобы форма из кэша браузера осталась
+    рабочей.
+    """
+    digest = hashlib.md5()
+    for part in (
+        changed_at.isoformat(),
+        str(request.user.pk),
+        request.META.get('CSRF_COOKIE', ''),
+        request.get_full_path(),
+        str(RENDER_VERSION),
+    ):
+        digest.update(part.encode())
+        digest.update(b'\0')
+    return quote_etag(digest.hexdigest())
+
+
+def conditional_page(changed_at):
+    """Отвечает 304 без отрисовки, если страница не менялась.
+
+    changed_at получает запрос и аргументы представления и возвращает
+    время последнего изменения страницы или None, если отметки нет.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            moment = changed_at(request, *args, **kwargs)
+            if moment is None:
+                return view(request, *args, **kwargs)
+            etag = page_etag(request, moment)
+            last_modified = int(moment.timestamp())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
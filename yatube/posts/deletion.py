@@ -0,0 +1,154 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import likes, sharding
+from .archive import archive_enabled, archived_posts
+from .conditional import touch_authors
+from .models import (ArchivedComment, Comment, DeletionRequest, Follow, Group,
+                     GroupDeletionRequest, Like, LikeCounterShard, Post,
+                     PostRoute, Recommendation)
+from .rendering import rebuild
+
+User = get_user_model()
+
+
+def request_deletion(user):
+    """Мягко удаляет пользователя: вход закрыт, профиль скрыт сразу.
+
+    Посты, комментарии, подписки и картинки потом удаляет пачками
+    команда purge_deleted.
+    """
+    with transaction.atomic():
+        DeletionRequest.objects.get_or_create(user=user)
+        if user.is_active:
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+
+
+def request_group_deletion(group):
+    """Мягко удаляет группу: из каталога и формы поста она пропадает сразу.
+
+    Страница группы открывается, пока purge_deleted пачками отвязывает
+    от неё посты: карточки в лентах до этого ссылаются на неё.
+    """
+    GroupDeletionRequest.objects.get_or_create(group=group)
+
+
+def delete_in_batches(queryset, batch_size, raw=False):
+    """Удаляет выборку пачками по pk, каждая пачка - своя транзакция.
+
+    Картинки удалённых постов стираются после фиксации пачки.
+    С raw=True пачка удаляется одним запросом без сигналов.
+    """
+    from sorl.thumbnail import delete as delete_image
+
+    total = 0
+    has_images = any(
+        field.name == 'image' for field in queryset.model._meta.fields)
+    while True:
+        batch = queryset.order_by('pk')[:batch_size]
+        if has_images:
+            rows = list(batch.values_list('pk', 'image'))
+        else:
+            rows = [(pk, '') for pk in batch.values_list('pk', flat=True)]
+        if not rows:
+            return total
+        pks = [pk for pk, _ in rows]
+        chunk = queryset.model.objects.using(queryset.db).filter(pk__in=pks)
+        with transaction.atomic(using=queryset.db):
+            if raw:
+                sharding.raw_delete(chunk)
+            else:
+                chunk.delete()
+        for _, image in rows:
+            if image:
+                delete_image(image)
+        total += len(rows)
+
+
+def purge_user(user_id, batch_size=500):
+    """Удаляет данные пользователя пачками, в конце - его самого.
+
+    Возвращает число удалённых строк без учёта последнего каскада.
+    """
+    total = 0
+    alias = sharding.shard_for_author(user_id)
+    for shard in sharding.shard_aliases():
+        total += delete_in_batches(
+            Comment.objects.using(shard).filter(author_id=user_id),
+            batch_size
+        )
+    for shard in sharding.shard_aliases():
+        user_likes = Like.objects.using(shard).filter(user_id=user_id)
+        while True:
+            pks = list(user_likes.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            total += likes.forget_likes(
+                Like.objects.using(shard).filter(pk__in=pks))
+    for model in (Comment, Like, LikeCounterShard):
+        total += delete_in_batches(
+            model.objects.using(alias).filter(post__author_id=user_id),
+            batch_size,
+            raw=True
+        )
+    total += delete_in_batches(
+        sharding.hot_post_querysets([alias], author_id=user_id)[0],
+        batch_size
+    )
+    if archive_enabled():
+        posts = archived_posts(author_id=user_id)
+        comments = ArchivedComment.objects.using(posts.db)
+        total += delete_in_batches(
+            comments.filter(author_id=user_id), batch_size)
+        total += delete_in_batches(
+            comments.filter(post__author_id=user_id), batch_size, raw=True)
+        total += delete_in_batches(posts, batch_size)
+    for queryset in (
+        Follow.objects.filter(user_id=user_id),
+        Follow.objects.filter(author_id=user_id),
+        Recommendation.objects.filter(user_id=user_id),
+        Recommendation.objects.filter(author_id=user_id),
+        PostRoute.objects.filter(author_id=user_id),
+    ):
+        total += delete_in_batches(queryset, batch_size)
+    User.objects.filter(pk=user_id).delete()
+    return total
+
+
+def detach_in_batches(queryset, batch_size):
+    """Отвязывает посты выборки от группы пачками по pk.
+
+    Карточки пачки перерисовываются без ссылки на группу, отметки
+    авторов сдвигаются, чтобы профили и страницы постов не отдали 304.
+    """
+    total = 0
+    while True:
+        rows = list(queryset.order_by('pk').values_list(
+            'pk', 'author_id')[:batch_size])
+        if not rows:
+            return total
+        chunk = queryset.model.objects.using(queryset.db).filter(
+            pk__in=[pk for pk, _ in rows])
+        with transaction.atomic(using=queryset.db):
+            chunk.update(group=None)
+            rebuild(chunk, batch_size)
+        touch_authors(*{author_id for _, author_id in rows})
+        total += len(rows)
+
+
+def purge_group(group_id, batch_size=500):
+    """Отвязывает посты группы пачками, в конце удаляет её саму.
+
+    Сборщику Group.delete() после этого нечего обходить. Возвращает
+    число отвязанных постов.
+    """
+    total = 0
+    for alias in sharding.shard_aliases():
+        total += detach_in_batches(
+            Post.objects.using(alias).filter(group_id=group_id), batch_size)
+    if archive_enabled():
+        total += detach_in_batches(
+            archived_posts(group_id=group_id), batch_size)
+    Group.objects.filter(pk=group_id).delete()
+    return total
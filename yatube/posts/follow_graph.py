@@ -0,0 +1,215 @@
+import bisect
+import mmap
+import os
+import struct
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, FollowGraphChange
+
+MAX_DELTAS = 1000
+FOLD_AT = 256
+MAGIC = b'YFG1'
+HEADER = struct.Struct('<4sqqq')
+
+
+def build_csr(edges, nodes):
+    """Строит CSR: смещения строк и отсортированные соседи."""
+    edges = sorted(edges)
+    offsets = array('i', [0]) * (nodes + 1)
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for node in range(nodes):
+        offsets[node + 1] += offsets[node]
+    targets = array('i', [target for _, target in edges])
+    return offsets, targets
+
+
+class FollowGraph:
+    """Граф подписок в формате CSR в обе стороны.
+
+    user -> author хранится в out_*, author -> user в in_*. Изменения
+    после построения снимка лежат в наборах added и removed, пока их
+    не наберётся FOLD_AT: тогда они вливаются в массивы.
+    """
+
+    def __init__(self, generation, nodes, out_offsets, out_targets,
+                 in_offsets, in_targets):
+        self.generation = generation
+        self.nodes = nodes
+        self.out_offsets = out_offsets
+        self.out_targets = out_targets
+        self.in_offsets = in_offsets
+        self.in_targets = in_targets
+        self.added = set()
+        self.removed = set()
+
+    @classmethod
+    def from_edges(cls, edges, generation=0):
+        edges = list(edges)
+        nodes = max((max(edge) for edge in edges), default=-1) + 1
+        out_offsets, out_targets = build_csr(edges, nodes)
+        in_offsets, in_targets = build_csr(
+            [(author, user) for user, author in edges], nodes)
+        return cls(generation, nodes, out_offsets, out_targets,
+                   in_offsets, in_targets)
+
+    @classmethod
+    def from_db(cls, generation=0):
+        edges = Follow.objects.values_list('user_id', 'author_id')
+        return cls.from_edges(edges.iterator(), generation)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, generation, nodes, edges = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f'{path} не является графом подписок')
+        view = memoryview(buffer)[HEADER.size:].cast('i')
+        sizes = (nodes + 1, edges, nodes + 1, edges)
+        parts = []
+        start = 0
+        for size in sizes:
+            parts.append(view[start:start + size])
+            start += size
+        return cls(generation, nodes, *parts)
+
+    def save(self, path):
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(HEADER.pack(
+                MAGIC, self.generation, self.nodes, len(self.out_targets)))
+            for part in (self.out_offsets, self.out_targets,
+                         self.in_offsets, self.in_targets):
+                file.write(part.tobytes())
+        os.replace(temp_path, path)
+
+    def _row(self, offsets, targets, node):
+        if not 0 <= node < self.nodes:
+            return targets[0:0]
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def apply(self, user_id, author_id, added):
+        edge = (user_id, author_id)
+        if added:
+            self.removed.discard(edge)
+            self.added.add(edge)
+        else:
+            self.added.discard(edge)
+            self.removed.add(edge)
+
+    def edges(self):
+        for node in range(self.nodes):
+            for target in self._row(self.out_offsets, self.out_targets, node):
+                yield node, target
+
+    def fold(self):
+        """Вливает added и removed в массивы CSR, номер поколения тот же."""
+        edges = set(self.edges())
+        edges.difference_update(self.removed)
+        edges.update(self.added)
+        folded = FollowGraph.from_edges(edges, self.generation)
+        self.__dict__.update(folded.__dict__)
+
+    def follows(self, user_id, author_id):
+        edge = (user_id, author_id)
+        if edge in self.added:
+            return True
+        if edge in self.removed:
+            return False
+        row = self._row(self.out_offsets, self.out_targets, user_id)
+        index = bisect.bisect_left(row, author_id)
+        return index < len(row) and row[index] == author_id
+
+    def following(self, user_id):
+        row = self._row(self.out_offsets, self.out_targets, user_id)
+        authors = set(row)
+        authors.update(a for u, a in self.added if u == user_id)
+        authors.difference_update(a for u, a in self.removed if u == user_id)
+        return sorted(authors)
+
+    def followers(self, author_id):
+        row = self._row(self.in_offsets, self.in_targets, author_id)
+        users = set(row)
+        users.update(u for u, a in self.added if a == author_id)
+        users.difference_update(u for u, a in self.removed if a == author_id)
+        return sorted(users)
+
+    def mutual(self, user_id):
+        return sorted(
+            set(self.following(user_id)) & set(self.followers(user_id)))
+
+
+_graph = None
+
+
+def current_generation():
+    """Номер последнего изменения графа: последний id журнала."""
+    return FollowGraphChange.objects.order_by('-pk').values_list(
+        'pk', flat=True).first() or 0
+
+
+def record(user_id, author_id, added, using=None):
+    """Пишет изменение в журнал после фиксации подписки.
+
+    Журнал лежит в базе, поэтому его видят все процессы, а откаченная
+    подписка в него не попадает.
+    """
+    transaction.on_commit(
+        lambda: FollowGraphChange.objects.create(
+            user_id=user_id, author_id=author_id, added=added),
+        using=using
+    )
+
+
+def catch_up(graph, generation):
+    """Догоняет снимок по журналу, если отставание не больше MAX_DELTAS.
+
+    Повторное применение изменения ничего не портит, поэтому снимок
+    может быть построен чуть позже своего номера поколения.
+    """
+    missing = generation - graph.generation
+    if missing < 0 or missing > MAX_DELTAS:
+        return False
+    if missing:
+        changes = FollowGraphChange.objects.filter(
+            pk__gt=graph.generation, pk__lte=generation
+        ).order_by('pk').values_list('user_id', 'author_id', 'added')
+        for change in changes:
+            graph.apply(*change)
+        graph.generation = generation
+    if len(graph.added) + len(graph.removed) >= FOLD_AT:
+        graph.fold()
+    return True
+
+
+def prune_changes(generation):
+    """Удаляет записи журнала, которые уже не нужны никакому снимку."""
+    return FollowGraphChange.objects.filter(
+        pk__lte=generation - MAX_DELTAS).delete()[0]
+
+
+def load_graph(generation):
+    path = settings.FOLLOW_GRAPH_PATH
+    if path:
+        try:
+            graph = FollowGraph.load(path)
+        except (OSError, ValueError, struct.error):
+            graph = None
+        if graph is not None and catch_up(graph, generation):
+            return graph
+    graph = FollowGraph.from_db(generation)
+    if path:
+        graph.save(path)
+    return graph
+
+
+def get_graph():
+    global _graph
+    generation = current_generation()
+    if _graph is None or not catch_up(_graph, generation):
+        _graph = load_graph(generation)
+    return _graph
@@ -1,6 +1,6 @@
 from django import forms
 
-from .models import Post, Comment
+from .models import Group, Post, Comment
 
 
 class PostForm(forms.ModelForm):
@@ -16,6 +16,11 @@ class PostForm(forms.ModelForm):
             'group': ('Группа, к которой будет односиться пост')
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].queryset = Group.objects.filter(
+            deletion_request__isnull=True)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,61 @@
+import heapq
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Max
+
+from .models import Group, GroupStats
+from .sharding import post_querysets
+
+User = get_user_model()
+
+
+def record_post(group_id, username, pub_date):
+    """Учитывает новый пост группы без пересчёта по постам."""
+    stats, _ = GroupStats.objects.get_or_create(group_id=group_id)
+    authors = [username] + [
+        name for name in stats.recent_author_list() if name != username]
+    GroupStats.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_post=pub_date,
+        recent_authors=' '.join(authors[:settings.GROUP_RECENT_AUTHORS])
+    )
+
+
+def adjust_count(group_id, delta):
+    stats = GroupStats.objects.filter(pk=group_id)
+    if delta < 0:
+        stats = stats.filter(posts_count__gte=-delta)
+    stats.update(posts_count=F('posts_count') + delta)
+
+
+def refresh(group_id):
+    """Пересчитывает сводку группы по постам во всех шардах."""
+    size = settings.GROUP_RECENT_AUTHORS
+    posts_count = 0
+    latest = []
+    for queryset in post_querysets(group_id=group_id):
+        posts_count += queryset.count()
+        latest.extend(queryset.order_by().values('author_id').annotate(
+            last=Max('pub_date')).order_by('-last').values_list(
+                'author_id', 'last')[:size])
+    latest = heapq.nlargest(size, latest, key=itemgetter(1))
+    usernames = dict(User.objects.filter(
+        pk__in=[author_id for author_id, _ in latest]
+    ).values_list('pk', 'username'))
+    GroupStats.objects.update_or_create(group_id=group_id, defaults={
+        'posts_count': posts_count,
+        'last_post': latest[0][1] if latest else None,
+        'recent_authors': ' '.join(
+            usernames[author_id] for author_id, _ in latest
+            if author_id in usernames
+        ),
+    })
+
+
+def rebuild():
+    group_ids = list(Group.objects.values_list('pk', flat=True))
+    for group_id in group_ids:
+        refresh(group_id)
+    return len(group_ids)
@@ -0,0 +1,162 @@
+import random
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Like, LikeCounterShard
+
+COUNT_KEY = 'likes:{}'
+
+
+def bump(post_id, delta, using, shard=None):
+    """Меняет случайную часть счётчика поста на delta.
+
+    Писатели одного поста попадают в разные строки, поэтому не ждут
+    блокировки друг друга. Часть создаётся при первой записи в неё.
+    """
+    if shard is None:
+        shard = random.randrange(settings.LIKE_COUNTER_SHARDS)
+    counters = LikeCounterShard.objects.using(using)
+    now = timezone.now()
+    updated = counters.filter(post_id=post_id, shard=shard).update(
+        count=F('count') + delta, updated_at=now)
+    if updated:
+        return
+    try:
+        with transaction.atomic(using=using):
+            counters.create(
+                post_id=post_id, shard=shard, count=delta, updated_at=now)
+    except IntegrityError:
+        counters.filter(post_id=post_id, shard=shard).update(
+            count=F('count') + delta, updated_at=now)
+
+
+def bump_cached(post_id, delta):
+    """Правит закэшированную сумму; если её нет, её соберут при чтении."""
+    try:
+        if delta > 0:
+            cache.incr(COUNT_KEY.format(post_id), delta)
+        else:
+            cache.decr(COUNT_KEY.format(post_id), -delta)
+    except ValueError:
+        pass
+
+
+def like(user, post):
+    """Ставит лайк, возвращает False, если он уже стоял."""
+    using = post._state.db
+    try:
+        with transaction.atomic(using=using):
+            Like.objects.using(using).create(user=user, post=post)
+            bump(post.pk, 1, using)
+    except IntegrityError:
+        return False
+    transaction.on_commit(lambda: bump_cached(post.pk, 1), using=using)
+    return True
+
+
+def unlike(user, post):
+    using = post._state.db
+    with transaction.atomic(using=using):
+        deleted, _ = Like.objects.using(using).filter(
+            user=user, post=post).delete()
+        if deleted:
+            bump(post.pk, -1, using)
+    if deleted:
+        transaction.on_commit(lambda: bump_cached(post.pk, -1), using=using)
+    return bool(deleted)
+
+
+def is_liked(user, post):
+    if not user.is_authenticated or post.is_archived:
+        return False
+    return Like.objects.using(post._state.db).filter(
+        user=user, post=post).exists()
+
+
+def forget_likes(likes):
+    """Удаляет лайки из выборки и вычитает их из счётчиков постов."""
+    using = likes.db
+    rows = list(likes.values_list('pk', 'post_id'))
+    if not rows:
+        return 0
+    with transaction.atomic(using=using):
+        Like.objects.using(using).filter(
+            pk__in=[pk for pk, _ in rows]).delete()
+        per_post = Counter(post_id for _, post_id in rows)
+        for post_id, total in per_post.items():
+            bump(post_id, -total, using)
+    cache.delete_many([COUNT_KEY.format(post_id) for post_id in per_post])
+    return len(rows)
+
+
+def like_counts(posts, fresh=False):
+    """Число лайков постов: из кэша, промахи - одним запросом на базу.
+
+    С fresh=True кэш не читается, только обновляется: так страница
+    поста не покажет сумму, устаревшую в кэше другого процесса.
+    У архивных постов число хранится в самой строке.
+    """
+    counts = {}
+    by_db = defaultdict(list)
+    for post in posts:
+        if post.is_archived:
+            counts[post.pk] = post.likes_count
+        else:
+            by_db[post._state.db].append(post.pk)
+    wanted = [pk for pks in by_db.values() for pk in pks]
+    cached = {} if fresh else cache.get_many(
+        [COUNT_KEY.format(pk) for pk in wanted])
+    for pk in wanted:
+        value = cached.get(COUNT_KEY.format(pk))
+        if value is not None:
+            counts[pk] = value
+    fresh = {}
+    for using, pks in by_db.items():
+        missing = [pk for pk in pks if pk not in counts]
+        if not missing:
+            continue
+        fresh.update(dict.fromkeys(missing, 0))
+        fresh.update(LikeCounterShard.objects.using(using).filter(
+            post_id__in=missing
+        ).order_by().values('post_id').annotate(
+            total=Sum('count')).values_list('post_id', 'total'))
+    if fresh:
+        cache.set_many(
+            {COUNT_KEY.format(pk): total for pk, total in fresh.items()},
+            settings.LIKE_CACHE_TIMEOUT
+        )
+        counts.update(fresh)
+    return counts
+
+
+def attach_like_counts(posts, fresh=False):
+    """Проставляет likes_count постам страницы."""
+    posts = list(posts)
+    counts = like_counts(posts, fresh)
+    for post in posts:
+        post.likes_count = counts.get(post.pk, 0)
+    return posts
+
+
+def compact(post_id, using):
+    """Складывает части счётчика поста в одну.
+
+    Сумма и время последнего лайка, а с ним и ETag поста, не меняются.
+    """
+    counters = LikeCounterShard.objects.using(using).filter(post_id=post_id)
+    with transaction.atomic(using=using):
+        rows = list(counters.select_for_update().values_list(
+            'pk', 'count', 'updated_at'))
+        if len(rows) < 2:
+            return False
+        total = sum(count for _, count, _ in rows)
+        keep = rows[0][0]
+        counters.exclude(pk=keep).delete()
+        counters.filter(pk=keep).update(
+            count=total, updated_at=max(moment for *_, moment in rows))
+    return True
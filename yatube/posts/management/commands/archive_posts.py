@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from posts import sharding
+from posts.archive import archive_alias, copy_to
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Like,
+                          LikeCounterShard, Post)
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архив'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.POSTS_ARCHIVE_AFTER,
+            help='Возраст поста в днях, по умолчанию POSTS_ARCHIVE_AFTER'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['days'] is None:
+            raise CommandError('POSTS_ARCHIVE_AFTER не настроен')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        for alias in sharding.shard_aliases():
+            posts = Post.objects.using(alias).filter(pub_date__lt=cutoff)
+            if options['dry_run']:
+                self.stdout.write(f'{alias}: к переносу {posts.count()}')
+                continue
+            total = 0
+            while True:
+                moved = self.move_batch(alias, posts, options['batch_size'])
+                if not moved:
+                    break
+                total += moved
+            self.stdout.write(f'{alias}: перенесено {total}')
+
+    def move_batch(self, alias, posts, batch_size):
+        """Копирует пачку в архив, потом удаляет её из горячих таблиц.
+
+        Если перенос прервётся между шагами, следующий запуск повторит
+        пачку: строки, уже попавшие в архив, пропускаются.
+        """
+        batch = list(posts.order_by('pk')[:batch_size])
+        if not batch:
+            return 0
+        post_ids = [post.pk for post in batch]
+        comments = Comment.objects.using(alias).filter(post_id__in=post_ids)
+        counters = LikeCounterShard.objects.using(alias).filter(
+            post_id__in=post_ids)
+        totals = dict(counters.order_by().values('post_id').annotate(
+            total=Sum('count')).values_list('post_id', 'total'))
+        copies = []
+        for post in batch:
+            copy = copy_to(ArchivedPost, post)
+            copy.likes_count = totals.get(post.pk, 0)
+            copies.append(copy)
+        target = archive_alias()
+        with transaction.atomic(using=target):
+            ArchivedPost.objects.using(target).bulk_create(
+                copies, ignore_conflicts=True)
+            ArchivedComment.objects.using(target).bulk_create(
+                [copy_to(ArchivedComment, comment) for comment in comments],
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+        with transaction.atomic(using=alias):
+            sharding.raw_delete(comments)
+            sharding.raw_delete(
+                Like.objects.using(alias).filter(post_id__in=post_ids))
+            sharding.raw_delete(counters)
+            sharding.raw_delete(
+                Post.objects.using(alias).filter(pk__in=post_ids))
+        return len(batch)
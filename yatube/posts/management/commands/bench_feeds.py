@@ -0,0 +1,83 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench_feeds',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время ответа HTML-лент и JSON API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--username',
+            help='Пользователь для профиля и ленты подписок'
+        )
+
+    def handle(self, *args, **options):
+        """Замер идёт на отдельном кэше в памяти процесса.
+
+        Перед каждым запросом кэш очищается, и рабочий кэш со счётчиками,
+        сессиями и корзинами ограничений при этом не трогается.
+        """
+        with override_settings(CACHES=BENCH_CACHES):
+            self.run(options)
+
+    def run(self, options):
+        client = Client()
+        pairs = [
+            ('index', reverse('posts:index'), reverse('posts:api_index')),
+        ]
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+            if user is None:
+                raise CommandError('Пользователь не найден')
+            client.force_login(user)
+            kwargs = {'username': user.username}
+            pairs += [
+                (
+                    'profile',
+                    reverse('posts:profile', kwargs=kwargs),
+                    reverse('posts:api_profile', kwargs=kwargs)
+                ),
+                (
+                    'follow',
+                    reverse('posts:follow_index'),
+                    reverse('posts:api_follow')
+                ),
+            ]
+        for name, html_url, json_url in pairs:
+            for kind, url in (('html', html_url), ('json', json_url)):
+                elapsed, size = self.measure(
+                    client, url, options['requests'])
+                self.stdout.write(
+                    f'{name:<8} {kind:<5} {elapsed:8.2f} мс/запрос '
+                    f'{size:>8} байт'
+                )
+
+    def measure(self, client, url, count):
+        cache.clear()
+        size = len(self.fetch(client, url))
+        start = time.perf_counter()
+        for _ in range(count):
+            cache.clear()
+            self.fetch(client, url)
+        return (time.perf_counter() - start) * 1000 / count, size
+
+    def fetch(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
@@ -0,0 +1,77 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts import likes
+from posts.models import Like
+from posts.sharding import post_querysets
+
+
+class Command(BaseCommand):
+    help = 'Замеряет запись лайков в один пост и чтение счётчиков ленты'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writes', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--shards', type=int, default=8)
+        parser.add_argument('--page', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        queryset = post_querysets()[0]
+        posts = list(queryset[:options['page']])
+        if not posts:
+            raise CommandError('Нет постов для замера')
+        self.stdout.write('Запись в один пост, в секунду:')
+        for shards in sorted({1, options['shards']}):
+            rate = self.write_rate(posts[0], shards, options)
+            self.stdout.write(f'{shards:>4} частей {rate:10.0f}')
+        self.stdout.write(f'Счётчики страницы из {len(posts)} постов:')
+        keys = [likes.COUNT_KEY.format(post.pk) for post in posts]
+        readers = (
+            ('по посту', lambda: {
+                post.pk: Like.objects.using(post._state.db).filter(
+                    post=post).count()
+                for post in posts
+            }),
+            ('холодный', lambda: (
+                cache.delete_many(keys), likes.like_counts(posts))),
+            ('из кэша', lambda: likes.like_counts(posts)),
+        )
+        for name, read in readers:
+            elapsed = self.measure(read, options['repeat'])
+            self.stdout.write(f'{name:<9} {elapsed:8.2f} мс')
+
+    def write_rate(self, post, shards, options):
+        """Потоки пишут +1 и -1 поровну: сумма поста не меняется.
+
+        Лишние части счётчика потом сложит compact_likes.
+        """
+        using = post._state.db
+        threads = options['threads']
+        per_thread = max(options['writes'] // threads // 2, 1)
+
+        def write(_):
+            try:
+                for delta in (1, -1) * per_thread:
+                    likes.bump(post.pk, delta, using,
+                               shard=random.randrange(shards))
+            finally:
+                connections[using].close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(write, range(threads)))
+        elapsed = time.perf_counter() - start
+        return per_thread * 2 * threads / elapsed
+
+    def measure(self, read, repeat):
+        read()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            read()
+        return (time.perf_counter() - start) * 1000 / repeat
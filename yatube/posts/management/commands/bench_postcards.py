@@ -0,0 +1,48 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.cards import PostCard, card_rows
+from posts.sharding import post_querysets
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает память и время построения Post и PostCard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--compact', action='store_true')
+
+    def handle(self, *args, **options):
+        queryset = post_querysets()[0]
+        limit = options['limit']
+        if not queryset.exists():
+            raise CommandError('Нет постов для замера')
+        builders = (
+            ('Post', lambda: list(queryset[:limit])),
+            ('PostCard', lambda: [
+                PostCard.from_row(row)
+                for row in card_rows(queryset, options['compact'])[:limit]
+            ]),
+        )
+        for name, build in builders:
+            elapsed, peak, count = self.measure(build, options['repeat'])
+            self.stdout.write(
+                f'{name:<9} {count:>6} шт. {elapsed:8.2f} мс '
+                f'{peak / 1024:10.1f} КБ'
+            )
+
+    def measure(self, build, repeat):
+        build()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            items = build()
+        elapsed = (time.perf_counter() - start) * 1000 / repeat
+        del items
+        tracemalloc.start()
+        items = build()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, len(items)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.follow_graph import (FollowGraph, current_generation,
+                                prune_changes)
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает снимок графа подписок и чистит журнал изменений'
+    requires_system_checks = False
+
+    def handle(self, *args, **options):
+        path = settings.FOLLOW_GRAPH_PATH
+        if not path:
+            raise CommandError('FOLLOW_GRAPH_PATH не настроен')
+        graph = FollowGraph.from_db(current_generation())
+        graph.save(path)
+        pruned = prune_changes(graph.generation)
+        self.stdout.write(
+            f'{path}: {graph.nodes} узлов, {len(graph.out_targets)} рёбер, '
+            f'удалено записей журнала {pruned}'
+        )
@@ -0,0 +1,54 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from posts.models import AuthorMarker, Follow, Recommendation
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации, на кого подписаться'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--limit', type=int, default=settings.RECOMMENDATIONS_COUNT)
+
+    def handle(self, *args, **options):
+        try:
+            from posts import recommendations
+        except ImportError as error:
+            raise CommandError('Для расчёта нужны numpy и scipy') from error
+        edges = list(Follow.objects.values_list('user_id', 'author_id'))
+        size = (User.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+        if options['processes'] > 1:
+            connections.close_all()
+        rows = list(recommendations.compute(
+            edges,
+            size,
+            options['limit'],
+            chunk_size=options['chunk_size'],
+            processes=options['processes']
+        ))
+        with transaction.atomic():
+            Recommendation.objects.all().delete()
+            Recommendation.objects.bulk_create(
+                [
+                    Recommendation(user_id=user, author_id=author, score=score)
+                    for user, author, score in rows
+                ],
+                batch_size=1000
+            )
+            AuthorMarker.objects.filter(
+                author_id__in=Recommendation.objects.values('user_id')
+            ).update(changed_at=timezone.now())
+        self.stdout.write(f'Сохранено рекомендаций: {len(rows)}')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from posts import likes, sharding
+from posts.models import LikeCounterShard
+
+
+class Command(BaseCommand):
+    help = 'Складывает части счётчиков лайков в одну строку на пост'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = 0
+        for alias in sharding.shard_aliases():
+            split = LikeCounterShard.objects.using(alias).order_by().values(
+                'post_id').annotate(parts=Count('pk')).filter(parts__gt=1)
+            post_ids = list(split.values_list('post_id', flat=True)[
+                :options['batch_size']])
+            for post_id in post_ids:
+                total += likes.compact(post_id, alias)
+        self.stdout.write(f'Сжато счётчиков: {total}')
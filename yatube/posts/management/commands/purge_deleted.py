@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.deletion import purge_group, purge_user
+from posts.models import DeletionRequest, GroupDeletionRequest
+
+
+class Command(BaseCommand):
+    help = 'Стирает данные мягко удалённых пользователей и групп пачками'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        requests = DeletionRequest.objects.order_by(
+            'requested_at').values_list('user_id', flat=True)
+        for user_id in list(requests):
+            total = purge_user(user_id, options['batch_size'])
+            self.stdout.write(f'{user_id}: удалено строк {total}')
+        groups = GroupDeletionRequest.objects.order_by(
+            'requested_at').values_list('group_id', flat=True)
+        for group_id in list(groups):
+            total = purge_group(group_id, options['batch_size'])
+            self.stdout.write(f'группа {group_id}: отвязано постов {total}')
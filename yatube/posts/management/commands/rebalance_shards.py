@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from posts import sharding
+from posts.models import Comment, Like, LikeCounterShard, Post
+
+User = get_user_model()
+
+# Порядок удаления: сначала строки, ссылающиеся на пост.
+MOVED_MODELS = (Comment, Like, LikeCounterShard, Post)
+
+
+class Command(BaseCommand):
+    help = 'Переносит авторов с постами и комментариями между шардами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*')
+        parser.add_argument('--to', dest='target')
+        parser.add_argument(
+            '--auto',
+            action='store_true',
+            help='Выровнять число постов в шардах'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        shards = sharding.get_shards()
+        if not shards:
+            raise CommandError('POSTS_SHARDS не настроен')
+        if options['auto']:
+            moves = self.plan_auto(shards)
+        else:
+            target = options['target']
+            if target not in shards:
+                raise CommandError(f'Неизвестный шард: {target}')
+            authors = User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('pk', flat=True)
+            moves = [(author_id, target) for author_id in authors]
+        for author_id, target in moves:
+            source = sharding.shard_for_author(author_id)
+            if source == target:
+                continue
+            self.stdout.write(f'{author_id}: {source} -> {target}')
+            if not options['dry_run']:
+                self.move_author(
+                    author_id, source, target, options['batch_size'])
+
+    def plan_auto(self, shards):
+        loads = dict.fromkeys(shards, 0)
+        authors = {}
+        for alias in shards:
+            rows = Post.objects.using(alias).order_by().values(
+                'author_id').annotate(total=Count('pk'))
+            for row in rows:
+                authors[row['author_id']] = [alias, row['total']]
+                loads[alias] += row['total']
+        moves = []
+        while True:
+            heavy = max(loads, key=loads.get)
+            light = min(loads, key=loads.get)
+            gap = loads[heavy] - loads[light]
+            candidates = [
+                (abs(gap - 2 * total), author_id)
+                for author_id, (alias, total) in authors.items()
+                if alias == heavy and 0 < total < gap
+            ]
+            if not candidates:
+                return moves
+            author_id = min(candidates)[1]
+            total = authors[author_id][1]
+            authors[author_id][0] = light
+            loads[heavy] -= total
+            loads[light] += total
+            moves.append((author_id, light))
+
+    def move_author(self, author_id, source, target, batch_size):
+        """Копирует посты автора с комментариями и лайками, потом
+        удаляет из старого шарда только скопированные строки.
+
+        Записанное в старый шард во время переноса остаётся там,
+        о таких строках команда сообщает.
+        """
+        posts = Post.objects.using(source).filter(
+            author_id=author_id).order_by('pk')
+        copied = {model: [] for model in MOVED_MODELS}
+        last_pk = 0
+        with transaction.atomic(using=target):
+            while True:
+                batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                post_ids = [post.pk for post in batch]
+                Post.objects.using(target).bulk_create(batch)
+                copied[Post] += post_ids
+                for model in (Comment, Like, LikeCounterShard):
+                    rows = list(model.objects.using(source).filter(
+                        post_id__in=post_ids))
+                    copied[model] += [row.pk for row in rows]
+                    for row in rows:
+                        row.pk = None
+                    model.objects.using(target).bulk_create(
+                        rows, batch_size=batch_size)
+        sharding.set_author_shard(author_id, target)
+        with transaction.atomic(using=source):
+            for model in MOVED_MODELS:
+                pks = copied[model]
+                for start in range(0, len(pks), batch_size):
+                    sharding.raw_delete(model.objects.using(source).filter(
+                        pk__in=pks[start:start + batch_size]))
+        left = posts.count()
+        if left:
+            self.stderr.write(
+                f'{author_id}: в {source} осталось постов, записанных '
+                f'во время переноса: {left}'
+            )
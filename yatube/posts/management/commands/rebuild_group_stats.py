@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import group_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сводки групп по всем постам'
+    requires_system_checks = False
+
+    def handle(self, *args, **options):
+        total = group_stats.rebuild()
+        self.stdout.write(f'Пересчитано групп: {total}')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from posts import sharding
+from posts.archive import archive_enabled, archived_posts
+from posts.models import Post
+from posts.rendering import RENDER_VERSION, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Перерисовывает сохранённые карточки постов'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перерисовать и карточки текущей версии'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        targets = [
+            (alias, Post.objects.using(alias).all())
+            for alias in sharding.shard_aliases()
+        ]
+        if archive_enabled():
+            targets.append(('archive', archived_posts()))
+        for name, posts in targets:
+            if not options['all']:
+                posts = posts.exclude(rendered_version=RENDER_VERSION)
+            total = rebuild(posts, options['batch_size'])
+            self.stdout.write(
+                f'{name}: перерисовано {total}, версия {RENDER_VERSION}')
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_recommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='rendered',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='rendered_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 15:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_rendered'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('last_post', models.DateTimeField(blank=True, null=True)),
+                ('recent_authors', models.TextField(blank=True)),
+            ],
+        ),
+    ]
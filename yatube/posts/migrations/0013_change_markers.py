@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def create_author_markers(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    AuthorMarker = apps.get_model('posts', 'AuthorMarker')
+    db = schema_editor.connection.alias
+    AuthorMarker.objects.using(db).bulk_create(
+        [
+            AuthorMarker(author_id=pk)
+            for pk in User.objects.using(db).values_list('pk', flat=True)
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_groupstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='groupstats',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='AuthorMarker',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='marker', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(create_author_markers, migrations.RunPython.noop),
+    ]
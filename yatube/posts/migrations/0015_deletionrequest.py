@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0014_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionRequest',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='deletion_request', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
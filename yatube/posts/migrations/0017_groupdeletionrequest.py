@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupDeletionRequest',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='deletion_request', serialize=False, to='posts.Group')),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
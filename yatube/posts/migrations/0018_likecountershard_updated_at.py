@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_groupdeletionrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='likecountershard',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
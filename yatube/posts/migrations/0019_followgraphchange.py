@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_likecountershard_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowGraphChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('author_id', models.IntegerField()),
+                ('added', models.BooleanField()),
+            ],
+        ),
+    ]
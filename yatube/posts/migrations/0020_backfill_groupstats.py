@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def create_group_stats(apps, schema_editor):
+    """Сводки для групп, созданных до GroupStats, по постам этой базы.
+
+    Без сводки первый новый пост группы записал бы в неё счётчик 1.
+    Посты в шардах здесь не видны: после включения шардов сводки
+    пересчитывает rebuild_group_stats.
+    """
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    Post = apps.get_model('posts', 'Post')
+    db = schema_editor.connection.alias
+    missing = list(Group.objects.using(db).filter(
+        stats__isnull=True).values_list('pk', flat=True))
+    stats = []
+    for group_id in missing:
+        posts = Post.objects.using(db).filter(group_id=group_id)
+        latest = list(posts.order_by().values('author__username').annotate(
+            last=Max('pub_date')
+        ).order_by('-last')[:settings.GROUP_RECENT_AUTHORS])
+        stats.append(GroupStats(
+            group_id=group_id,
+            posts_count=posts.aggregate(total=Count('pk'))['total'],
+            last_post=latest[0]['last'] if latest else None,
+            recent_authors=' '.join(
+                row['author__username'] for row in latest),
+        ))
+    GroupStats.objects.using(db).bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_followgraphchange'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_group_stats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -16,23 +17,31 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='posts'
+        related_name='posts',
+        db_constraint=False
     )
     group = models.ForeignKey(
         Group,
         on_delete=models.SET_NULL,
         blank=True,
         null=True,
-        related_name='posts'
+        related_name='posts',
+        db_constraint=False
     )
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
         blank=True
     )
+    rendered = models.TextField(blank=True, editable=False)
+    rendered_version = models.PositiveSmallIntegerField(
+        default=0, editable=False)
+
+    is_archived = False
 
     class Meta:
         ordering = ('-pub_date', )
@@ -50,11 +59,61 @@ class Comment(models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        db_constraint=False
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('post', 'created'), name='comment_post_created_idx')
+        ]
+
+
+class Like(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        db_constraint=False
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_like')
+        ]
+
+
+class LikeCounterShard(models.Model):
+    """Часть счётчика лайков поста. Сумма частей - число лайков.
+
+    Самое позднее updated_at частей - время последнего лайка поста.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='like_counters'
+    )
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'shard'], name='unique_like_counter_shard')
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -73,3 +132,172 @@ class Follow(models.Model):
             models.UniqueConstraint(
                 fields=['user', 'author'], name='unique_follow')
         ]
+
+
+class FollowGraphChange(models.Model):
+    """Журнал подписок и отписок для графа подписок в процессах.
+
+    id записи - номер поколения графа.
+    """
+
+    user_id = models.IntegerField()
+    author_id = models.IntegerField()
+    added = models.BooleanField()
+
+
+class AuthorShard(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='shard'
+    )
+    alias = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f'{self.author_id} -> {self.alias}'
+
+
+class PostRoute(models.Model):
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ('-score', )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_recommendation')
+        ]
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    last_post = models.DateTimeField(null=True, blank=True)
+    recent_authors = models.TextField(blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def recent_author_list(self):
+        return self.recent_authors.split()
+
+
+class AuthorMarker(models.Model):
+    """Время последнего изменения всего, что видно в профиле автора."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='marker'
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый командой archive_posts. Только чтение.
+
+    Поля повторяют Post без auto_now, чтобы перенос не менял даты.
+    Связи без каскада: архив может жить в отдельной базе.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_constraint=False
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.DO_NOTHING,
+        blank=True,
+        null=True,
+        related_name='+',
+        db_constraint=False
+    )
+    image = models.ImageField(upload_to='posts/', blank=True)
+    rendered = models.TextField(blank=True)
+    rendered_version = models.PositiveSmallIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ('-pub_date', )
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_constraint=False
+    )
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('post', 'created'),
+                name='archived_comment_created_idx'
+            )
+        ]
+
+
+class DeletionRequest(models.Model):
+    """Пользователь, удалённый мягко. Его данные стирает purge_deleted."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion_request'
+    )
+    requested_at = models.DateTimeField(default=timezone.now)
+
+
+class GroupDeletionRequest(models.Model):
+    """Группа, удалённая мягко. Посты от неё отвязывает purge_deleted."""
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion_request'
+    )
+    requested_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,105 @@
+"""Оповещение о новых постах внутри процесса и между процессами.
+
+Ожидающие запросы спят на Condition с номером поколения. Каждый
+процесс слушает свой датаграммный Unix-сокет в NEWPOSTS_SOCKET_DIR;
+публикация рассылает по одной датаграмме во все сокеты папки, и
+слушатель будит ожидающих. Без NEWPOSTS_SOCKET_DIR оповещение
+остаётся внутри процесса.
+"""
+import os
+import socket
+import threading
+
+from django.conf import settings
+
+_condition = threading.Condition()
+_generation = 0
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def generation():
+    return _generation
+
+
+def wake():
+    global _generation
+    with _condition:
+        _generation += 1
+        _condition.notify_all()
+
+
+def wait(seen, timeout):
+    """Ждёт поколения новее seen не дольше timeout, возвращает номер."""
+    with _condition:
+        _condition.wait_for(lambda: _generation != seen, timeout)
+        return _generation
+
+
+def socket_path(pid):
+    return os.path.join(settings.NEWPOSTS_SOCKET_DIR, f'{pid}.sock')
+
+
+def listen():
+    """Поднимает сокет и поток слушателя этого процесса один раз.
+
+    После форка номер процесса другой, и воркер заводит свой сокет.
+    """
+    global _listener
+    directory = settings.NEWPOSTS_SOCKET_DIR
+    if not directory or not hasattr(socket, 'AF_UNIX'):
+        return
+    pid = os.getpid()
+    with _listener_lock:
+        if _listener == pid:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = socket_path(pid)
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(path)
+        thread = threading.Thread(
+            target=receive, args=(sock,), name='newposts', daemon=True)
+        thread.start()
+        _listener = pid
+
+
+def receive(sock):
+    while True:
+        sock.recv(16)
+        wake()
+
+
+def publish():
+    """Будит ожидающих во всех процессах."""
+    wake()
+    directory = settings.NEWPOSTS_SOCKET_DIR
+    if directory and hasattr(socket, 'AF_UNIX'):
+        fan_out(directory)
+
+
+def fan_out(directory):
+    """Шлёт датаграмму в сокеты других процессов, мёртвые удаляет."""
+    own = socket_path(os.getpid())
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for entry in entries:
+            if entry.name.endswith('.sock') and entry.path != own:
+                send(sock, entry.path)
+
+
+def send(sock, path):
+    try:
+        sock.sendto(b'1', path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    except OSError:
+        pass
@@ -0,0 +1,84 @@
+import heapq
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from django.utils import timezone
+
+from .sharding import with_related
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(moment, pk):
+    return f'{(moment - EPOCH) // MICROSECOND}_{pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = cursor.split('_')
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def _value(item, name):
+    if isinstance(item, dict):
+        return item['id' if name == 'pk' else name]
+    return getattr(item, name)
+
+
+def after_cursor(queryset, position, field, descending):
+    moment, pk = position
+    lookup = 'lt' if descending else 'gt'
+    return queryset.filter(
+        Q(**{f'{field}__{lookup}': moment})
+        | Q(**{field: moment, f'pk__{lookup}': pk})
+    )
+
+
+def cursor_page(querysets, cursor, size, field='pub_date', descending=True,
+                build=None):
+    """Страница по курсору (дата, id) вместо номера страницы.
+
+    Принимает один queryset или список выборок из разных шардов.
+    build превращает строки выборки в объекты страницы, например
+    кортежи values_list в PostCard.
+    Возвращает объекты страницы и курсор следующей страницы или None.
+    """
+    if isinstance(querysets, QuerySet):
+        querysets = [querysets]
+    sign = '-' if descending else ''
+    position = decode_cursor(cursor) if cursor else None
+    parts = []
+    for queryset in querysets:
+        queryset = queryset.order_by(f'{sign}{field}', f'{sign}pk')
+        if position is not None:
+            queryset = after_cursor(queryset, position, field, descending)
+        rows = queryset[:size + 1]
+        parts.append([build(row) for row in rows] if build else list(rows))
+    merged = heapq.merge(
+        *parts,
+        key=lambda item: (_value(item, field), _value(item, 'pk')),
+        reverse=descending
+    )
+    items = list(islice(merged, size + 1))
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    last = items[-1]
+    return items, encode_cursor(_value(last, field), _value(last, 'pk'))
+
+
+def comment_page(post, cursor=None):
+    comments = with_related(post.comments.all(), 'author')
+    return cursor_page(
+        comments,
+        cursor,
+        settings.COMMENTS_ON_PAGE,
+        field='created',
+        descending=False
+    )
@@ -0,0 +1,65 @@
+import multiprocessing
+from functools import partial
+from itertools import repeat
+
+import numpy as np
+from scipy import sparse
+
+_follows = None
+
+
+def follow_matrix(edges, size):
+    edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+    data = np.ones(len(edges), dtype=np.int32)
+    return sparse.csr_matrix(
+        (data, (edges[:, 0], edges[:, 1])), shape=(size, size))
+
+
+def init_worker(follows):
+    global _follows
+    _follows = follows
+
+
+def top_candidates(bounds, limit):
+    """Лучшие друзья друзей для строк [start, stop) матрицы подписок.
+
+    Вес кандидата - число общих авторов, через которых он найден. Сам
+    пользователь и те, на кого он уже подписан, отбрасываются.
+    """
+    start, stop = bounds
+    chunk = _follows[start:stop]
+    scores = (chunk @ _follows).tocsr()
+    results = []
+    for offset in range(stop - start):
+        user = start + offset
+        row = slice(scores.indptr[offset], scores.indptr[offset + 1])
+        candidates = scores.indices[row]
+        weights = scores.data[row]
+        followed = chunk.indices[chunk.indptr[offset]:chunk.indptr[offset + 1]]
+        keep = (candidates != user) & ~np.isin(candidates, followed)
+        candidates, weights = candidates[keep], weights[keep]
+        if len(candidates) > limit:
+            best = np.argpartition(-weights, limit)[:limit]
+            candidates, weights = candidates[best], weights[best]
+        results.extend(
+            zip(repeat(user), candidates.tolist(), weights.tolist()))
+    return results
+
+
+def compute(edges, size, limit, chunk_size=1000, processes=1):
+    """Считает рекомендации для всех пользователей кусками строк."""
+    follows = follow_matrix(edges, size)
+    chunks = [
+        (start, min(start + chunk_size, size))
+        for start in range(0, size, chunk_size)
+    ]
+    work = partial(top_candidates, limit=limit)
+    if processes <= 1:
+        init_worker(follows)
+        for chunk in chunks:
+            yield from work(chunk)
+        return
+    with multiprocessing.Pool(
+            processes, initializer=init_worker, initargs=(follows,)) as pool:
+        for rows in pool.imap_unordered(work, chunks):
+            yield from rows
@@ -0,0 +1,70 @@
+import logging
+
+from django.template.loader import render_to_string
+
+from .models import Post
+from .sharding import with_related
+
+RENDER_VERSION = 1
+TEMPLATE = 'posts/includes/post_body.html'
+
+logger = logging.getLogger(__name__)
+
+
+def render_post(post):
+    """Карточка поста или None, если шаблон не отрисовался.
+
+    Ошибка пишется в лог, а сохранение поста и перерисовка остальных
+    карточек не падают из-за одной.
+    """
+    try:
+        return render_to_string(TEMPLATE, {'post': post})
+    except Exception:
+        logger.exception('Не удалось нарисовать карточку поста %s', post.pk)
+        return None
+
+
+def store_rendered(post):
+    """Рисует карточку поста и сохраняет её одним UPDATE без сигналов.
+
+    Неудачную карточку не сохраняет: версия остаётся старой, и пост
+    перерисует rebuild_post_html.
+    """
+    rendered = render_post(post)
+    if rendered is None:
+        return
+    post.rendered = rendered
+    post.rendered_version = RENDER_VERSION
+    Post.objects.using(post._state.db).filter(pk=post.pk).update(
+        rendered=post.rendered, rendered_version=RENDER_VERSION)
+
+
+def rebuild(queryset, batch_size=500):
+    """Перерисовывает посты пачками по pk, возвращает их число.
+
+    Подходит и для выборки из архива, посты с неудачной карточкой
+    пропускает. Увеличьте RENDER_VERSION при
+    изменении post_body.html, чтобы rebuild_post_html перерисовал все
+    старые карточки.
+    """
+    total = 0
+    last_pk = 0
+    while True:
+        batch = list(with_related(
+            queryset.filter(pk__gt=last_pk).order_by('pk'),
+            'author', 'group'
+        )[:batch_size])
+        if not batch:
+            return total
+        changed = []
+        for post in batch:
+            rendered = render_post(post)
+            if rendered is None:
+                continue
+            post.rendered = rendered
+            post.rendered_version = RENDER_VERSION
+            changed.append(post)
+        queryset.model.objects.using(queryset.db).bulk_update(
+            changed, ['rendered', 'rendered_version'])
+        total += len(changed)
+        last_pk = batch[-1].pk
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+
+from . import sharding
+from .models import (ArchivedComment, ArchivedPost, Comment, Like,
+                     LikeCounterShard, Post)
+
+User = get_user_model()
+
+SHARDED_MODELS = (Post, Comment, Like, LikeCounterShard)
+ARCHIVE_MODELS = (ArchivedPost, ArchivedComment)
+
+
+class ArchiveRouter:
+    """Кладёт архив старых постов в базу POSTS_ARCHIVE_DB.
+
+    Авторы и группы архивных постов остаются в базе default. Пока
+    POSTS_ARCHIVE_DB не задан, архив лежит рядом с остальными таблицами.
+    """
+
+    def _db_for(self, model, instance=None):
+        alias = settings.POSTS_ARCHIVE_DB
+        if not alias:
+            return None
+        if issubclass(model, ARCHIVE_MODELS):
+            return alias
+        if isinstance(instance, ARCHIVE_MODELS):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if settings.POSTS_ARCHIVE_DB and (
+                isinstance(obj1, ARCHIVE_MODELS)
+                or isinstance(obj2, ARCHIVE_MODELS)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        alias = settings.POSTS_ARCHIVE_DB
+        if not alias:
+            return None
+        is_archive_model = app_label == 'posts' and model_name in (
+            'archivedpost', 'archivedcomment')
+        if db == alias:
+            return is_archive_model
+        if is_archive_model:
+            return False
+        return None
+
+
+class AuthorShardRouter:
+    """Кладёт пост, комментарии и лайки к нему в шард автора поста.
+
+    Остальные модели живут в базе default. Пока POSTS_SHARDS пуст,
+    роутер ничего не решает и всё работает с одной базой. Базе из
+    _state.db верим, только если это шард: присвоение группы новому
+    посту ставит туда default.
+    """
+
+    def _db_for(self, model, instance=None):
+        if not sharding.is_sharded():
+            return None
+        if not issubclass(model, SHARDED_MODELS):
+            return DEFAULT_DB_ALIAS
+        if (isinstance(instance, SHARDED_MODELS)
+                and instance._state.db in sharding.get_shards()):
+            return instance._state.db
+        if isinstance(instance, User):
+            return sharding.shard_for_author(instance.pk)
+        if isinstance(instance, Post):
+            return sharding.shard_for_author(instance.author_id)
+        if isinstance(instance, (Comment, Like, LikeCounterShard)):
+            return sharding.shard_for_post(instance.post_id)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if sharding.is_sharded():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in sharding.get_shards():
+            return app_label == 'posts' and model_name in (
+                'post', 'comment', 'like', 'likecountershard')
+        return None
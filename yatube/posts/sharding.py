@@ -0,0 +1,222 @@
+import heapq
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.shortcuts import get_object_or_404
+
+from .archive import archive_enabled, archived_posts
+from .models import AuthorShard, Follow, Post, PostRoute
+
+SHARD_CACHE_KEY = 'posts:shard:{}'
+
+
+def get_shards():
+    return list(settings.POSTS_SHARDS)
+
+
+def is_sharded():
+    return bool(settings.POSTS_SHARDS)
+
+
+def shard_aliases():
+    """Базы, в которых хранятся посты и комментарии."""
+    return get_shards() or [DEFAULT_DB_ALIAS]
+
+
+def hashed_shard(author_id):
+    shards = get_shards()
+    return shards[author_id % len(shards)]
+
+
+def shard_for_author(author_id):
+    """Шард автора: запись в справочнике или остаток от деления id."""
+    if not is_sharded():
+        return DEFAULT_DB_ALIAS
+    key = SHARD_CACHE_KEY.format(author_id)
+    alias = cache.get(key)
+    if alias is None:
+        alias = AuthorShard.objects.filter(
+            author_id=author_id).values_list('alias', flat=True).first()
+        if alias is None:
+            alias = hashed_shard(author_id)
+        cache.set(key, alias, settings.POSTS_SHARD_CACHE_TIMEOUT)
+    return alias
+
+
+def set_author_shard(author_id, alias):
+    """Меняет шард автора. Кэш сбрасывается только в этом процессе,
+    остальные увидят новый шард через POSTS_SHARD_CACHE_TIMEOUT.
+    """
+    AuthorShard.objects.update_or_create(
+        author_id=author_id, defaults={'alias': alias})
+    cache.delete(SHARD_CACHE_KEY.format(author_id))
+
+
+def shard_for_post(post_id):
+    if not is_sharded():
+        return DEFAULT_DB_ALIAS
+    author_id = PostRoute.objects.filter(
+        pk=post_id).values_list('author_id', flat=True).first()
+    if author_id is None:
+        return None
+    return shard_for_author(author_id)
+
+
+def allocate_post_id(author_id):
+    """Выдаёт id поста, уникальный для всех шардов."""
+    return PostRoute.objects.create(author_id=author_id).pk
+
+
+def get_post_or_404(pk, archived=False):
+    """Пост по id; с archived=True ищется и в архиве старых постов."""
+    if not is_sharded():
+        queryset = Post.objects.all()
+    else:
+        queryset = Post.objects.using(shard_for_post(pk) or DEFAULT_DB_ALIAS)
+    if not archived or not archive_enabled():
+        return get_object_or_404(queryset, pk=pk)
+    try:
+        return queryset.get(pk=pk)
+    except Post.DoesNotExist:
+        return get_object_or_404(archived_posts(), pk=pk)
+
+
+def with_related(queryset, *fields):
+    """select_related внутри одной базы, prefetch_related между базами."""
+    if is_sharded() or queryset.db != DEFAULT_DB_ALIAS:
+        return queryset.prefetch_related(*fields)
+    return queryset.select_related(*fields)
+
+
+def raw_delete(queryset):
+    """Удаляет строки одним запросом, без сигналов и каскада в Python."""
+    return queryset._raw_delete(queryset.db)
+
+
+class MergedPostList:
+    """Список постов из нескольких шардов, слитый по дате публикации.
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator.
+    """
+
+    ordered = True
+
+    def __init__(self, querysets, key=attrgetter('pub_date')):
+        self.querysets = querysets
+        self.key = key
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return heapq.merge(*self.querysets, key=self.key, reverse=True)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop
+        parts = [list(queryset[:stop]) for queryset in self.querysets]
+        merged = heapq.merge(*parts, key=self.key, reverse=True)
+        return list(islice(merged, start, stop))
+
+
+class TieredPostList:
+    """Горячие посты, за ними архив.
+
+    В архив уходят посты старше порога, поэтому все они старше
+    горячих. Срез берётся из горячей части, а глубокие страницы
+    проваливаются в архив со смещением на число горячих постов.
+    """
+
+    ordered = True
+
+    def __init__(self, hot, archive):
+        self.hot = hot
+        self.archive = archive
+        self._hot_count = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count() + self.archive.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        yield from self.hot
+        yield from self.archive
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop
+        hot_count = self.hot_count()
+        items = []
+        if start < hot_count:
+            items.extend(self.hot[start:stop])
+        if stop is None or stop > hot_count:
+            archive_stop = None if stop is None else stop - hot_count
+            items.extend(
+                self.archive[max(start - hot_count, 0):archive_stop])
+        return items
+
+
+def hot_post_querysets(aliases=None, **filters):
+    return [
+        Post.objects.using(alias).filter(**filters)
+        for alias in aliases or shard_aliases()
+    ]
+
+
+def post_querysets(aliases=None, **filters):
+    """Выборки постов из всех шардов и, если он включён, из архива."""
+    querysets = hot_post_querysets(aliases, **filters)
+    if archive_enabled():
+        querysets.append(archived_posts(**filters))
+    return querysets
+
+
+def combine(hot, **filters):
+    posts = hot[0] if len(hot) == 1 else MergedPostList(hot)
+    if not archive_enabled():
+        return posts
+    return TieredPostList(posts, archived_posts(**filters))
+
+
+def post_list(**filters):
+    if not is_sharded() and not archive_enabled():
+        return Post.objects.filter(**filters)
+    return combine(hot_post_querysets(**filters), **filters)
+
+
+def followed_authors(user):
+    authors = list(Follow.objects.filter(
+        user=user).values_list('author_id', flat=True))
+    aliases = sorted({shard_for_author(author) for author in authors})
+    return aliases, {'author_id__in': authors}
+
+
+def followed_post_querysets(user):
+    if not is_sharded() and not archive_enabled():
+        return [Post.objects.filter(author__following__user=user)]
+    aliases, filters = followed_authors(user)
+    return post_querysets(aliases, **filters)
+
+
+def followed_posts(user):
+    if not is_sharded() and not archive_enabled():
+        return Post.objects.filter(author__following__user=user)
+    aliases, filters = followed_authors(user)
+    return combine(hot_post_querysets(aliases, **filters), **filters)
@@ -0,0 +1,237 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import (archive, follow_graph, group_stats, likes, notify,
+               sharding, trending)
+from .conditional import touch_authors, touch_groups
+from .models import (ArchivedComment, ArchivedPost, AuthorMarker, Comment,
+                     Follow, Group, GroupStats, Like, Post)
+from .tasks import (refresh_group_stats, render_author_posts,
+                    render_group_posts, render_post_html)
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Post)
+def allocate_sharded_post_id(sender, instance, **kwargs):
+    if sharding.is_sharded() and instance.pk is None:
+        instance.pk = sharding.allocate_post_id(instance.author_id)
+
+
+@receiver(pre_delete, sender=User)
+def delete_sharded_author_content(sender, instance, **kwargs):
+    if not sharding.is_sharded():
+        return
+    for alias in sharding.get_shards():
+        Comment.objects.using(alias).filter(author_id=instance.pk).delete()
+        Comment.objects.using(alias).filter(
+            post__author_id=instance.pk).delete()
+        Post.objects.using(alias).filter(author_id=instance.pk).delete()
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_likes(sender, instance, **kwargs):
+    for alias in sharding.shard_aliases():
+        likes.forget_likes(
+            Like.objects.using(alias).filter(user_id=instance.pk))
+
+
+@receiver(pre_delete, sender=Group)
+def unlink_sharded_group_posts(sender, instance, **kwargs):
+    if not sharding.is_sharded():
+        return
+    for alias in sharding.get_shards():
+        Post.objects.using(alias).filter(group_id=instance.pk).update(
+            group=None)
+
+
+@receiver(pre_delete, sender=User)
+def delete_archived_author_content(sender, instance, **kwargs):
+    if not archive.archive_enabled():
+        return
+    alias = archive.archive_alias()
+    ArchivedComment.objects.using(alias).filter(
+        author_id=instance.pk).delete()
+    ArchivedPost.objects.using(alias).filter(author_id=instance.pk).delete()
+
+
+@receiver(pre_delete, sender=Group)
+def unlink_archived_group_posts(sender, instance, **kwargs):
+    if archive.archive_enabled():
+        archive.archived_posts(group_id=instance.pk).update(
+            group=None, rendered='')
+
+
+@receiver(post_save, sender=Follow)
+def record_follow(sender, instance, created, **kwargs):
+    if created:
+        follow_graph.record(
+            instance.user_id, instance.author_id, True,
+            using=instance._state.db)
+        trending.record(
+            'authors', instance.author_id, trending.FOLLOW_WEIGHT)
+
+
+@receiver(post_delete, sender=Follow)
+def record_unfollow(sender, instance, **kwargs):
+    follow_graph.record(
+        instance.user_id, instance.author_id, False,
+        using=instance._state.db)
+
+
+@receiver(post_save, sender=Post)
+def record_trending_post(sender, instance, created, **kwargs):
+    if not created:
+        return
+    trending.record('authors', instance.author_id, trending.POST_WEIGHT)
+    if instance.group_id:
+        trending.record('groups', instance.group_id, trending.POST_WEIGHT)
+
+
+@receiver(pre_save, sender=Post)
+def clear_rendered_post(sender, instance, **kwargs):
+    instance.rendered = ''
+
+
+@receiver(post_save, sender=Post)
+def render_post(sender, instance, **kwargs):
+    """Карточку рисует задача после фиксации, до неё - шаблоны ленты."""
+    post_id = instance.pk
+    transaction.on_commit(
+        lambda: render_post_html.delay(
+            post_id, dedup_key=f'render:post:{post_id}'),
+        using=instance._state.db
+    )
+
+
+@receiver(post_save, sender=User)
+def rerender_author_posts(sender, instance, created, update_fields=None,
+                          **kwargs):
+    if created or update_fields and set(update_fields) <= {
+            'last_login', 'is_active'}:
+        return
+    render_author_posts.delay(
+        instance.pk, dedup_key=f'render:author:{instance.pk}')
+
+
+@receiver(post_save, sender=Group)
+def rerender_group_posts(sender, instance, created, **kwargs):
+    if not created:
+        render_group_posts.delay(
+            instance.pk, dedup_key=f'render:group:{instance.pk}')
+
+
+@receiver(pre_delete, sender=Group)
+def clear_group_post_html(sender, instance, **kwargs):
+    for alias in sharding.shard_aliases():
+        Post.objects.using(alias).filter(group_id=instance.pk).update(
+            rendered='')
+
+
+@receiver(post_save, sender=Comment)
+def record_trending_comment(sender, instance, created, **kwargs):
+    if not created:
+        return
+    trending.record('posts', instance.post_id, trending.COMMENT_WEIGHT)
+    if instance.post.group_id:
+        trending.record(
+            'groups', instance.post.group_id, trending.COMMENT_WEIGHT)
+
+
+def schedule_group_refresh(group_id, using):
+    transaction.on_commit(
+        lambda: refresh_group_stats.delay(
+            group_id, dedup_key=f'group_stats:{group_id}'),
+        using=using
+    )
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    if instance._state.adding:
+        return
+    instance.previous_group_id = Post.objects.using(
+        instance._state.db).filter(pk=instance.pk).values_list(
+            'group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats(sender, instance, created, **kwargs):
+    """Новый пост учитываем сразу, переезд между группами - счётчиком.
+
+    Дату и авторов старой и новой группы пересчитывает задача.
+    """
+    if created:
+        if instance.group_id:
+            group_stats.record_post(
+                instance.group_id, instance.author.username,
+                instance.pub_date
+            )
+        return
+    previous = getattr(instance, 'previous_group_id', None)
+    if previous == instance.group_id:
+        return
+    for group_id, delta in ((previous, -1), (instance.group_id, 1)):
+        if group_id:
+            group_stats.adjust_count(group_id, delta)
+            schedule_group_refresh(group_id, instance._state.db)
+
+
+@receiver(post_delete, sender=Post)
+def forget_group_post(sender, instance, **kwargs):
+    if instance.group_id:
+        group_stats.adjust_count(instance.group_id, -1)
+        schedule_group_refresh(instance.group_id, instance._state.db)
+
+
+@receiver(post_save, sender=User)
+def touch_changed_user(sender, instance, created, update_fields=None,
+                       **kwargs):
+    if created:
+        AuthorMarker.objects.get_or_create(author=instance)
+    elif not (update_fields and set(update_fields) <= {'last_login'}):
+        touch_authors(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def touch_changed_group(sender, instance, created, **kwargs):
+    if not created:
+        touch_groups(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post_pages(sender, instance, **kwargs):
+    touch_authors(instance.author_id)
+    touch_groups(
+        instance.group_id, getattr(instance, 'previous_group_id', None))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comment_pages(sender, instance, **kwargs):
+    try:
+        touch_authors(instance.post.author_id)
+    except Post.DoesNotExist:
+        pass
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def touch_follow_pages(sender, instance, **kwargs):
+    touch_authors(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def announce_new_post(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(notify.publish, using=instance._state.db)
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from . import notify
+from .pagination import after_cursor, decode_cursor
+from .sharding import followed_post_querysets, post_querysets
+
+FEEDS = ('index', 'follow')
+
+waiters = threading.BoundedSemaphore(settings.NEWPOSTS_MAX_WAITERS)
+
+
+def count_new(user, feed, position):
+    """Сколько постов в ленте вышло после поста на позиции курсора."""
+    if feed == 'follow':
+        querysets = followed_post_querysets(user)
+    else:
+        querysets = post_querysets()
+    return sum(
+        after_cursor(queryset, position, 'pub_date', False).count()
+        for queryset in querysets
+    )
+
+
+def parse_seen(request):
+    try:
+        return max(int(request.GET.get('seen', 0)), 0)
+    except ValueError:
+        return 0
+
+
+def long_poll(user, feed, position, seen):
+    """Отвечает сразу, если число изменилось, иначе ждёт оповещения."""
+    generation = notify.generation()
+    count = count_new(user, feed, position)
+    if count == seen and waiters.acquire(blocking=False):
+        try:
+            notify.wait(generation, settings.NEWPOSTS_POLL_TIMEOUT)
+        finally:
+            waiters.release()
+        count = count_new(user, feed, position)
+    return JsonResponse({'count': count})
+
+
+def events(user, feed, position):
+    """Поток server-sent events: число новых постов при каждом изменении.
+
+    Без оповещений раз в NEWPOSTS_KEEPALIVE уходит комментарий, чтобы
+    прокси не закрыл соединение. Через NEWPOSTS_STREAM_TIMEOUT поток
+    заканчивается, и EventSource переподключается сам.
+    """
+    retry = f'retry: {settings.NEWPOSTS_POLL_TIMEOUT * 1000}\n\n'
+    if not waiters.acquire(blocking=False):
+        yield retry
+        return
+    try:
+        yield retry
+        deadline = time.monotonic() + settings.NEWPOSTS_STREAM_TIMEOUT
+        generation = notify.generation()
+        last = None
+        while True:
+            count = count_new(user, feed, position)
+            if count != last:
+                yield f'event: posts\ndata: {json.dumps({"count": count})}\n\n'
+                last = count
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                current = notify.wait(
+                    generation, min(settings.NEWPOSTS_KEEPALIVE, remaining))
+                if current != generation:
+                    generation = current
+                    break
+                yield ': keep-alive\n\n'
+    finally:
+        waiters.release()
+
+
+@require_GET
+def new_posts(request):
+    """Число новых постов в ленте после курсора: SSE или long-poll."""
+    feed = request.GET.get('feed', 'index')
+    if feed not in FEEDS:
+        raise Http404
+    if feed == 'follow' and not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Требуется авторизация'}, status=401)
+    position = decode_cursor(request.GET.get('cursor'))
+    if position is None:
+        return JsonResponse({'detail': 'Нужен курсор'}, status=400)
+    notify.listen()
+    user = request.user
+    if 'text/event-stream' not in request.META.get('HTTP_ACCEPT', ''):
+        return long_poll(user, feed, position, parse_seen(request))
+    response = StreamingHttpResponse(
+        events(user, feed, position), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,51 @@
+from core.tasks import task
+
+from . import group_stats
+from .archive import archive_enabled, archived_posts
+from .conditional import touch_groups
+from .models import Post
+from .rendering import rebuild, store_rendered
+from .sharding import shard_aliases, shard_for_author, shard_for_post
+
+
+@task
+def render_post_html(post_id):
+    """Рисует карточку поста вместе с миниатюрой картинки."""
+    alias = shard_for_post(post_id)
+    if alias is None:
+        return
+    post = Post.objects.using(alias).filter(pk=post_id).first()
+    if post is not None:
+        store_rendered(post)
+
+
+@task
+def render_author_posts(author_id):
+    """Перерисовывает карточки автора и сбрасывает ETag его групп.
+
+    bulk_update сигналов не шлёт, а страницы групп показывают карточки
+    с именем автора.
+    """
+    alias = shard_for_author(author_id)
+    querysets = [Post.objects.using(alias).filter(author_id=author_id)]
+    if archive_enabled():
+        querysets.append(archived_posts(author_id=author_id))
+    group_ids = set()
+    for queryset in querysets:
+        rebuild(queryset)
+        group_ids.update(queryset.order_by().values_list(
+            'group_id', flat=True).distinct())
+    touch_groups(*group_ids)
+
+
+@task
+def render_group_posts(group_id):
+    for alias in shard_aliases():
+        rebuild(Post.objects.using(alias).filter(group_id=group_id))
+    if archive_enabled():
+        rebuild(archived_posts(group_id=group_id))
+
+
+@task
+def refresh_group_stats(group_id):
+    group_stats.refresh(group_id)
@@ -0,0 +1,30 @@
+from django import template
+
+from posts.likes import attach_like_counts
+from posts.pagination import encode_cursor
+
+register = template.Library()
+
+
+@register.filter
+def first_cursor(page_obj):
+    """Курсор первого поста первой страницы: от него считаются новые."""
+    if not page_obj or page_obj.number != 1:
+        return ''
+    first = page_obj[0]
+    return encode_cursor(first.pub_date, first.pk)
+
+
+@register.filter
+def next_cursor(page_obj):
+    """Курсор для подгрузки постов после последнего на странице."""
+    if not page_obj or not page_obj.has_next():
+        return ''
+    last = page_obj[len(page_obj) - 1]
+    return encode_cursor(last.pub_date, last.pk)
+
+
+@register.filter
+def with_likes(posts):
+    """Посты страницы с числом лайков: кэш и один запрос на промахи."""
+    return attach_like_counts(posts)
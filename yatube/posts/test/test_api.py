@@ -0,0 +1,99 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+def read_json(response):
+    return json.loads(response.content)
+
+
+@override_settings(API_PAGE_SIZE=3)
+class FeedApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое поле'
+        )
+        for i in range(5):
+            cls.post = Post.objects.create(
+                text=f'Тестовый текст {i}',
+                author=cls.user,
+                group=cls.group
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_return_posts(self):
+        """Ленты отдают посты с автором и группой"""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group', kwargs={'slug': self.group.slug}),
+            reverse('posts:api_profile', kwargs={'username': 'auth'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                data = read_json(self.guest_client.get(url))
+                first = data['results'][0]
+                self.assertEqual(first['id'], self.post.id)
+                self.assertEqual(first['text'], self.post.text)
+                self.assertEqual(first['author'], 'auth')
+                self.assertEqual(first['group'], 'test-slug')
+                self.assertEqual(len(data['results']), 3)
+
+    def test_cursor_pagination(self):
+        """Курсор ведёт на следующую страницу без повторов"""
+        url = reverse('posts:api_index')
+        first = read_json(self.guest_client.get(url))
+        second = read_json(
+            self.guest_client.get(url, {'cursor': first['next']}))
+        ids = [row['id'] for row in first['results'] + second['results']]
+        expected = Post.objects.order_by('-pub_date', '-pk')
+        self.assertEqual(ids, list(expected.values_list('id', flat=True)))
+        self.assertIsNone(second['next'])
+
+    def test_compact_fields(self):
+        """Компактный набор полей отдаёт отрывок вместо текста"""
+        data = read_json(self.guest_client.get(
+            reverse('posts:api_index'), {'fields': 'compact'}))
+        row = data['results'][0]
+        self.assertNotIn('text', row)
+        self.assertEqual(row['excerpt'], self.post.text)
+
+    def test_etag_not_modified(self):
+        """Повторный запрос с ETag получает 304"""
+        url = reverse('posts:api_index')
+        response = self.guest_client.get(url)
+        etag = response['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_follow_feed(self):
+        """Лента подписок доступна только авторизованным"""
+        url = reverse('posts:api_follow')
+        self.assertEqual(self.guest_client.get(url).status_code, 401)
+        data = read_json(self.reader_client.get(url))
+        self.assertEqual(data['results'][0]['author'], 'auth')
+
+    def test_post_detail(self):
+        """Пост отдаётся вместе с комментариями"""
+        data = read_json(self.guest_client.get(
+            reverse('posts:api_post', kwargs={'post_id': self.post.id})))
+        self.assertEqual(data['post']['text'], self.post.text)
+        self.assertEqual(data['results'][0]['author'], 'reader')
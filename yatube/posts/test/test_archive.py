@@ -0,0 +1,91 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_ARCHIVE_AFTER=30)
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.old = Post.objects.create(
+            text='Старый пост', author=self.author, group=self.group)
+        Post.objects.filter(pk=self.old.pk).update(
+            pub_date=timezone.now() - timedelta(days=60))
+        Comment.objects.create(
+            post=self.old, author=self.author, text='Старый комментарий')
+        self.new = Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group)
+
+    def test_old_posts_move_to_archive(self):
+        """Команда переносит старые посты с комментариями в архив."""
+        call_command('archive_posts', stdout=StringIO())
+        self.assertFalse(Post.objects.filter(pk=self.old.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.new.pk).exists())
+        archived = ArchivedPost.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.text, 'Старый пост')
+        self.assertEqual(archived.group, self.group)
+        self.assertTrue(ArchivedComment.objects.filter(
+            post=archived, text='Старый комментарий').exists())
+
+    def test_dry_run_keeps_posts(self):
+        """С --dry-run посты остаются на месте."""
+        call_command('archive_posts', '--dry-run', stdout=StringIO())
+        self.assertTrue(Post.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(ArchivedPost.objects.exists())
+
+    def test_pages_fall_through_to_archive(self):
+        """Профиль, группа и страница поста видят архивные посты."""
+        call_command('archive_posts', stdout=StringIO())
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username]))
+        self.assertEqual(response.context['count_posts'], 2)
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.new.pk, self.old.pk]
+        )
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug]))
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.old.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['post'].is_archived)
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_archived_posts_are_read_only(self):
+        """Архивный пост нельзя править и комментировать."""
+        call_command('archive_posts', stdout=StringIO())
+        response = self.client.get(
+            reverse('posts:post_edit', args=[self.old.pk]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.old.pk]),
+            {'text': 'Новый комментарий'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(POSTS_ARCHIVE_AFTER=None)
+    def test_days_required(self):
+        """Без POSTS_ARCHIVE_AFTER и --days команда не запускается."""
+        with self.assertRaises(CommandError):
+            call_command('archive_posts', stdout=StringIO())
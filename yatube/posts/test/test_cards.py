@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.cards import PostCard, card_rows
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PostCardTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Т' * 300, author=cls.user)
+
+    def test_card_from_values_list(self):
+        """Карточка строится из кортежа и знает адрес поста."""
+        row = card_rows(Post.objects.all(), compact=True).get()
+        card = PostCard.from_row(row)
+        self.assertEqual(card.pk, self.post.pk)
+        self.assertEqual(len(card.text), 140)
+        self.assertEqual(
+            card.url,
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertFalse(hasattr(card, '__dict__'))
+
+    def test_api_rows_have_url(self):
+        """Строки ленты API содержат адрес поста."""
+        response = self.client.get(reverse('posts:api_index'))
+        self.assertIn(
+            reverse('posts:post_detail', args=[self.post.pk]).encode(),
+            response.content
+        )
+
+    def test_bench_command(self):
+        """Команда замера печатает строку для каждого вида объектов."""
+        out = StringIO()
+        call_command('bench_postcards', '--repeat', '1', stdout=out)
+        self.assertIn('PostCard', out.getvalue())
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.tasks import render_author_posts
+
+User = get_user_model()
+
+
+class ConditionalPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.pages = {
+            'profile': reverse('posts:profile', args=[self.user.username]),
+            'group': reverse('posts:group_list', args=[self.group.slug]),
+            'post': reverse('posts:post_detail', args=[self.post.pk]),
+        }
+
+    def etag(self, url):
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        return response['ETag']
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_pages_return_304(self):
+        """Неизменённая страница отвечает 304."""
+        for name, url in self.pages.items():
+            with self.subTest(page=name):
+                self.assertEqual(self.revalidate(url, self.etag(url)), 304)
+
+    def test_new_post_changes_profile_and_group(self):
+        """Новый пост меняет профиль автора и страницу группы."""
+        etags = {name: self.etag(url) for name, url in self.pages.items()}
+        Post.objects.create(
+            text='Новый пост', author=self.user, group=self.group)
+        self.assertEqual(
+            self.revalidate(self.pages['profile'], etags['profile']), 200)
+        self.assertEqual(
+            self.revalidate(self.pages['group'], etags['group']), 200)
+
+    def test_author_rename_changes_group(self):
+        """Перерисовка карточек автора меняет страницу его группы."""
+        url = self.pages['group']
+        etag = self.etag(url)
+        render_author_posts(self.user.pk)
+        self.assertEqual(self.revalidate(url, etag), 200)
+
+    def test_comment_changes_post(self):
+        """Новый комментарий меняет страницу поста."""
+        url = self.pages['post']
+        etag = self.etag(url)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        self.assertEqual(self.revalidate(url, etag), 200)
+
+    def test_follow_changes_profile(self):
+        """Подписка меняет профиль автора."""
+        url = self.pages['profile']
+        etag = self.etag(url)
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertEqual(self.revalidate(url, etag), 200)
+
+    def test_etag_depends_on_viewer(self):
+        """Другой пользователь не получает чужую страницу из кэша."""
+        url = self.pages['profile']
+        etag = self.etag(url)
+        other = Client()
+        other.force_login(self.user)
+        response = other.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.deletion import request_deletion, request_group_deletion
+from posts.models import (Comment, DeletionRequest, Follow, Group,
+                          GroupDeletionRequest, GroupStats, Post)
+
+User = get_user_model()
+
+
+class DeletionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='leaving')
+        self.other = User.objects.create_user(username='staying')
+        self.post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group)
+        self.other_post = Post.objects.create(
+            text='Чужой пост', author=self.other)
+        Comment.objects.create(
+            post=self.other_post, author=self.user, text='Комментарий')
+        Comment.objects.create(
+            post=self.post, author=self.other, text='Ответ')
+        Follow.objects.create(user=self.user, author=self.other)
+        Follow.objects.create(user=self.other, author=self.user)
+
+    def test_soft_delete_hides_profile(self):
+        """Мягкое удаление сразу закрывает вход и профиль."""
+        request_deletion(self.user)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(
+            DeletionRequest.objects.filter(user=self.user).exists())
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+        response = Client().get(
+            reverse('posts:profile', args=[self.user.username]))
+        self.assertEqual(response.status_code, 404)
+        response = Client().get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_purge_removes_everything(self):
+        """purge_deleted удаляет данные пачками, затем пользователя."""
+        request_deletion(self.user)
+        call_command('purge_deleted', '--batch-size', '1', stdout=StringIO())
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Post.objects.filter(author_id=self.user.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(DeletionRequest.objects.exists())
+        self.assertTrue(Post.objects.filter(pk=self.other_post.pk).exists())
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 0)
+
+    def test_group_soft_delete_and_purge(self):
+        """Группа сразу пропадает из каталога, посты отвязываются пачками."""
+        Post.objects.create(text='Ещё пост', author=self.other,
+                            group=self.group)
+        request_group_deletion(self.group)
+        response = Client().get(reverse('posts:group_index'))
+        self.assertNotContains(response, self.group.title)
+        response = Client().get(
+            reverse('posts:group_list', args=[self.group.slug]))
+        self.assertEqual(response.status_code, 200)
+        call_command('purge_deleted', '--batch-size', '1', stdout=StringIO())
+        self.assertFalse(Group.objects.filter(pk=self.group.pk).exists())
+        self.assertFalse(GroupDeletionRequest.objects.exists())
+        self.assertEqual(Post.objects.filter(group__isnull=True).count(), 3)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertNotIn(self.group.slug, post.rendered)
+        self.assertIn('Пост', post.rendered)
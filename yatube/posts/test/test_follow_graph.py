@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts import follow_graph
+from posts.follow_graph import FollowGraph, get_graph
+from posts.models import Follow, FollowGraphChange
+
+User = get_user_model()
+
+TEMP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+GRAPH_PATH = os.path.join(TEMP_DIR, 'follow_graph.bin')
+
+
+@override_settings(FOLLOW_GRAPH_PATH=GRAPH_PATH)
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        cls.third = User.objects.create_user(username='third')
+        Follow.objects.create(user=cls.first, author=cls.second)
+        Follow.objects.create(user=cls.second, author=cls.first)
+        Follow.objects.create(user=cls.third, author=cls.second)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookups(self):
+        """Граф отвечает на вопросы о подписках"""
+        graph = FollowGraph.from_db()
+        self.assertTrue(graph.follows(self.first.pk, self.second.pk))
+        self.assertFalse(graph.follows(self.first.pk, self.third.pk))
+        self.assertEqual(
+            graph.followers(self.second.pk), [self.first.pk, self.third.pk])
+        self.assertEqual(graph.following(self.third.pk), [self.second.pk])
+        self.assertEqual(graph.mutual(self.first.pk), [self.second.pk])
+
+    def test_snapshot_roundtrip(self):
+        """Снимок, прочитанный через mmap, совпадает с исходным"""
+        FollowGraph.from_db(generation=7).save(GRAPH_PATH)
+        graph = FollowGraph.load(GRAPH_PATH)
+        self.assertEqual(graph.generation, 7)
+        self.assertEqual(
+            graph.followers(self.second.pk), [self.first.pk, self.third.pk])
+        self.assertFalse(graph.follows(self.second.pk, self.third.pk))
+
+    def test_fold_keeps_lookups(self):
+        """Изменения вливаются в массивы, ответы графа не меняются"""
+        graph = FollowGraph.from_db()
+        graph.apply(self.first.pk, self.third.pk, True)
+        graph.apply(self.first.pk, self.second.pk, False)
+        graph.fold()
+        self.assertEqual(graph.added, set())
+        self.assertEqual(graph.removed, set())
+        self.assertEqual(graph.following(self.first.pk), [self.third.pk])
+        self.assertEqual(
+            graph.followers(self.second.pk), [self.third.pk])
+
+    def test_profile_uses_graph(self):
+        """Профиль показывает подписку из графа"""
+        client = Client()
+        client.force_login(self.first)
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': 'second'}))
+        self.assertTrue(response.context['following'])
+
+
+@override_settings(FOLLOW_GRAPH_PATH=None)
+class FollowGraphChangesTest(TransactionTestCase):
+    """Журнал пишется после фиксации, поэтому без TestCase."""
+
+    def setUp(self):
+        self.first = User.objects.create_user(username='first')
+        self.second = User.objects.create_user(username='second')
+        self.third = User.objects.create_user(username='third')
+        Follow.objects.create(user=self.first, author=self.second)
+        follow_graph._graph = None
+
+    def tearDown(self):
+        follow_graph._graph = None
+
+    def test_graph_follows_changes(self):
+        """Подписка и отписка сразу видны в графе"""
+        graph = get_graph()
+        self.assertFalse(graph.follows(self.first.pk, self.third.pk))
+        Follow.objects.create(user=self.first, author=self.third)
+        self.assertTrue(get_graph().follows(self.first.pk, self.third.pk))
+        Follow.objects.filter(user=self.first, author=self.second).delete()
+        self.assertFalse(get_graph().follows(self.first.pk, self.second.pk))
+
+    def test_rolled_back_follow_not_published(self):
+        """Откаченная подписка не попадает ни в журнал, ни в граф"""
+        get_graph()
+        before = FollowGraphChange.objects.count()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Follow.objects.create(user=self.first, author=self.third)
+                raise RuntimeError
+        self.assertEqual(FollowGraphChange.objects.count(), before)
+        self.assertFalse(get_graph().follows(self.first.pk, self.third.pk))
+
+    def test_deltas_folded(self):
+        """Набравшиеся изменения вливаются в массивы снимка"""
+        get_graph()
+        with mock.patch.object(follow_graph, 'FOLD_AT', 2):
+            Follow.objects.create(user=self.first, author=self.third)
+            Follow.objects.create(user=self.third, author=self.first)
+            graph = get_graph()
+        self.assertEqual(graph.added, set())
+        self.assertEqual(
+            graph.following(self.first.pk), [self.second.pk, self.third.pk])
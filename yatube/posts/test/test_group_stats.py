@@ -0,0 +1,75 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание'
+        )
+
+    def test_new_posts_update_stats(self):
+        """Новые посты сразу попадают в сводку группы."""
+        Post.objects.create(text='Раз', author=self.first, group=self.group)
+        post = Post.objects.create(
+            text='Два', author=self.second, group=self.group)
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.last_post, post.pub_date)
+        self.assertEqual(stats.recent_author_list(), ['second', 'first'])
+
+    def test_move_and_delete_adjust_count(self):
+        """Смена группы и удаление поста меняют счётчики."""
+        post = Post.objects.create(
+            text='Раз', author=self.first, group=self.group)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(GroupStats.objects.get(
+            group=self.group).posts_count, 0)
+        self.assertEqual(GroupStats.objects.get(
+            group=self.other_group).posts_count, 1)
+        post.delete()
+        self.assertEqual(GroupStats.objects.get(
+            group=self.other_group).posts_count, 0)
+
+    def test_rebuild(self):
+        """Команда пересчитывает сводку по постам."""
+        Post.objects.bulk_create([
+            Post(text='Раз', author=self.first, group=self.group),
+            Post(text='Два', author=self.second, group=self.group),
+        ])
+        call_command('rebuild_group_stats', stdout=StringIO())
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(
+            sorted(stats.recent_author_list()), ['first', 'second'])
+        self.assertIsNotNone(stats.last_post)
+
+    def test_group_index_single_query(self):
+        """Каталог групп строится одним запросом."""
+        Post.objects.create(text='Раз', author=self.first, group=self.group)
+        with self.assertNumQueries(1):
+            response = Client().get(reverse('posts:group_index'))
+        self.assertContains(response, self.group.title)
+        self.assertContains(response, self.other_group.title)
+        groups = list(response.context['groups'])
+        self.assertEqual(groups[0], self.group)
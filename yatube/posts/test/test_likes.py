@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import likes
+from posts.models import Like, LikeCounterShard, Post
+
+User = get_user_model()
+
+
+class LikesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def count(self):
+        return likes.like_counts([self.post])[self.post.pk]
+
+    def test_like_once(self):
+        """Второй лайк того же пользователя не засчитывается."""
+        self.assertTrue(likes.like(self.reader, self.post))
+        self.assertFalse(likes.like(self.reader, self.post))
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(self.count(), 1)
+
+    def test_unlike(self):
+        """Снятый лайк вычитается из счётчика, повторное снятие - нет."""
+        likes.like(self.reader, self.post)
+        self.assertTrue(likes.unlike(self.reader, self.post))
+        self.assertFalse(likes.unlike(self.reader, self.post))
+        self.assertEqual(self.count(), 0)
+
+    def test_count_cached(self):
+        """Сумма частей счётчика читается из кэша."""
+        likes.like(self.reader, self.post)
+        self.assertEqual(self.count(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count(), 1)
+
+    @override_settings(LIKE_COUNTER_SHARDS=4)
+    def test_compaction_keeps_sum(self):
+        """Сжатие оставляет одну часть счётчика с той же суммой."""
+        for shard in range(4):
+            likes.bump(self.post.pk, shard + 1, 'default', shard=shard)
+        call_command('compact_likes', stdout=StringIO())
+        counters = LikeCounterShard.objects.filter(post=self.post)
+        self.assertEqual(counters.count(), 1)
+        self.assertEqual(counters.get().count, 10)
+
+    def test_like_view(self):
+        """Лайк со страницы поста виден в счётчике на ней."""
+        self.client.post(reverse('posts:like_post', args=[self.post.pk]))
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertEqual(response.context['post'].likes_count, 1)
+        self.assertTrue(response.context['liked'])
+        self.client.post(reverse('posts:unlike_post', args=[self.post.pk]))
+        cache.clear()
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertEqual(response.context['post'].likes_count, 0)
+
+    def test_like_requires_post(self):
+        """Лайк ставится только POST-запросом."""
+        response = self.client.get(
+            reverse('posts:like_post', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Like.objects.exists())
+
+    def test_like_changes_post_etag(self):
+        """После лайка страница поста не отдаётся из кэша браузера."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        etag = self.client.get(url)['ETag']
+        likes.like(self.author, self.post)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post'].likes_count, 1)
+
+    def test_counts_only_on_feeds_without_etag(self):
+        """Лайки видны в общей ленте, но не в профиле и группе."""
+        likes.like(self.author, self.post)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Нравится: 1')
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username]))
+        self.assertNotContains(response, 'Нравится')
+
+    def test_deleted_user_likes_forgotten(self):
+        """Лайки удалённого пользователя вычитаются из счётчика."""
+        likes.like(self.reader, self.post)
+        User.objects.filter(pk=self.reader.pk).get().delete()
+        self.assertEqual(self.count(), 0)
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Recommendation
+
+User = get_user_model()
+
+
+class RecommendationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.popular = User.objects.create_user(username='popular')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.user, author=cls.other)
+        Follow.objects.create(user=cls.friend, author=cls.popular)
+        Follow.objects.create(user=cls.other, author=cls.popular)
+        Follow.objects.create(user=cls.friend, author=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_friends_of_friends(self):
+        """Рекомендуются друзья друзей, на которых ещё нет подписки"""
+        call_command(
+            'build_recommendations', processes=1, stdout=StringIO())
+        recommendations = Recommendation.objects.filter(user=self.user)
+        self.assertEqual(
+            [(rec.author, rec.score) for rec in recommendations],
+            [(self.popular, 2)]
+        )
+
+    def test_follow_page_shows_suggestions(self):
+        """Лента подписок показывает рекомендации"""
+        Recommendation.objects.create(
+            user=self.user, author=self.popular, score=2)
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['suggestions'], [self.popular])
@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.rendering import RENDER_VERSION, rebuild
+from posts.tasks import render_post_html
+
+User = get_user_model()
+
+
+class RenderedPostTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user,
+            group=self.group,
+            text='Первая <b>строка</b>\nвторая строка'
+        )
+
+    def test_rendered_by_task(self):
+        """Карточку после сохранения рисует задача и хранит в базе."""
+        self.assertEqual(Post.objects.get(pk=self.post.pk).rendered, '')
+        render_post_html(self.post.pk)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.rendered_version, RENDER_VERSION)
+        self.assertIn('Лев Толстой', post.rendered)
+        self.assertIn('&lt;b&gt;строка&lt;/b&gt;<br>вторая', post.rendered)
+        self.assertIn(
+            reverse('posts:group_list', args=[self.group.slug]),
+            post.rendered
+        )
+
+    def test_rendered_on_edit(self):
+        """Правка поста сбрасывает карточку, задача рисует новую."""
+        render_post_html(self.post.pk)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        render_post_html(self.post.pk)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertIn('Новый текст', post.rendered)
+        self.assertNotIn('вторая строка', post.rendered)
+
+    def test_render_error_keeps_post(self):
+        """Ошибка шаблона пишется в лог, пустая карточка не сохраняется."""
+        group = Group.objects.create(
+            title='Группа', slug='Тестовый слаг', description='Описание')
+        post = Post.objects.create(
+            author=self.user, group=group, text='Текст')
+        with self.assertLogs('posts.rendering', 'ERROR'):
+            render_post_html(post.pk)
+        post = Post.objects.get(pk=post.pk)
+        self.assertEqual(post.rendered, '')
+        self.assertNotEqual(post.rendered_version, RENDER_VERSION)
+        with self.assertLogs('posts.rendering', 'ERROR'):
+            self.assertEqual(rebuild(Post.objects.filter(pk=post.pk)), 0)
+        self.assertNotEqual(
+            Post.objects.get(pk=post.pk).rendered_version, RENDER_VERSION)
+
+    def test_listing_uses_rendered(self):
+        """Ленты выводят сохранённую карточку как есть."""
+        Post.objects.filter(pk=self.post.pk).update(
+            rendered='<p>Сохранённая карточка</p>')
+        response = Client().get(
+            reverse('posts:profile', args=[self.user.username]))
+        self.assertContains(response, '<p>Сохранённая карточка</p>')
+
+    def test_listing_falls_back_without_rendered(self):
+        """Без сохранённой карточки пост рисуется шаблоном."""
+        Post.objects.filter(pk=self.post.pk).update(rendered='')
+        response = Client().get(
+            reverse('posts:group_list', args=[self.group.slug]))
+        self.assertContains(response, 'вторая строка')
+
+    def test_rebuild_command(self):
+        """Команда перерисовывает карточки старой версии."""
+        Post.objects.filter(pk=self.post.pk).update(
+            rendered='старая', rendered_version=0)
+        call_command('rebuild_post_html', stdout=StringIO())
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.rendered_version, RENDER_VERSION)
+        self.assertIn('вторая строка', post.rendered)
@@ -0,0 +1,211 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import likes, sharding
+from posts.models import AuthorShard, Comment, Group, Post
+from posts.routers import AuthorShardRouter
+from posts.sharding import MergedPostList, shard_for_author
+
+User = get_user_model()
+
+SHARDS = ['shard_0', 'shard_1']
+
+# Шарды для сквозных тестов: тестовый раннер создаст для них базы.
+for alias in SHARDS:
+    settings.DATABASES.setdefault(alias, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    })
+
+
+class MergedPostListTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        now = timezone.now()
+        for i in range(14):
+            post = Post.objects.create(
+                text=f'Пост {i}',
+                author=(cls.first, cls.second)[i % 2]
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(minutes=i))
+
+    def test_merge_keeps_date_order(self):
+        """Слияние выборок идёт в порядке убывания даты"""
+        merged = MergedPostList([
+            Post.objects.filter(author=self.first),
+            Post.objects.filter(author=self.second),
+        ])
+        expected = list(Post.objects.all())
+        self.assertEqual(merged.count(), len(expected))
+        self.assertEqual(merged[3:9], expected[3:9])
+        self.assertEqual(merged[0], expected[0])
+
+    def test_merged_list_paginates(self):
+        """Paginator работает поверх слитого списка"""
+        merged = MergedPostList([
+            Post.objects.filter(author=self.first),
+            Post.objects.filter(author=self.second),
+        ])
+        page = Paginator(merged, 10).get_page(2)
+        self.assertEqual(len(page), 4)
+        self.assertEqual(list(page), list(Post.objects.all()[10:]))
+
+
+@override_settings(POSTS_SHARDS=SHARDS)
+class AuthorShardRouterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.router = AuthorShardRouter()
+
+    def test_author_is_placed_by_id(self):
+        """Без записи в справочнике шард выбирается по id автора"""
+        expected = ['shard_0', 'shard_1'][self.user.pk % 2]
+        self.assertEqual(shard_for_author(self.user.pk), expected)
+
+    def test_directory_overrides_placement(self):
+        """Запись в справочнике важнее хеширования"""
+        AuthorShard.objects.create(author=self.user, alias='shard_1')
+        self.assertEqual(shard_for_author(self.user.pk), 'shard_1')
+
+    def test_post_goes_to_author_shard(self):
+        """Пост и комментарий пишутся в шард автора поста"""
+        AuthorShard.objects.create(author=self.user, alias='shard_1')
+        post = Post(author_id=self.user.pk, text='Текст')
+        self.assertEqual(
+            self.router.db_for_write(Post, instance=post), 'shard_1')
+        self.assertEqual(
+            self.router.db_for_read(Post, instance=self.user), 'shard_1')
+        post._state.db = 'shard_1'
+        comment = Comment(post=post, author=self.user, text='Текст')
+        self.assertEqual(
+            self.router.db_for_write(Comment, instance=comment), 'shard_1')
+
+    def test_other_models_stay_in_default(self):
+        """Пользователи и группы остаются в базе default"""
+        post = Post(author_id=self.user.pk, text='Текст')
+        self.assertEqual(
+            self.router.db_for_read(User, instance=post), 'default')
+        self.assertTrue(self.router.allow_migrate('shard_0', 'posts', 'post'))
+        self.assertFalse(
+            self.router.allow_migrate('shard_0', 'posts', 'follow'))
+
+
+@override_settings(POSTS_SHARDS=SHARDS)
+class ShardedViewsTest(TestCase):
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        AuthorShard.objects.create(author=cls.user, alias='shard_1')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_post_with_group_goes_to_author_shard(self):
+        """Пост с группой из формы пишется в шард автора и виден в лентах"""
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост в группе', 'group': self.group.pk}
+        )
+        post = Post.objects.using('shard_1').get(text='Пост в группе')
+        self.assertFalse(Post.objects.using('shard_0').exists())
+        self.assertFalse(Post.objects.using('default').exists())
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk]))
+        self.assertEqual(response.status_code, 200)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+        ):
+            with self.subTest(url=url):
+                cache.clear()
+                self.assertContains(self.client.get(url), 'Пост в группе')
+
+
+@override_settings(POSTS_SHARDS=SHARDS)
+class RebalanceShardsTest(TestCase):
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        sharding.set_author_shard(self.user.pk, 'shard_0')
+        self.posts = [
+            Post.objects.using('shard_0').create(
+                author=self.user, text=f'Пост {i}')
+            for i in range(3)
+        ]
+        for post in self.posts:
+            Comment.objects.using('shard_0').create(
+                post=post, author=self.reader, text='Комментарий')
+        likes.like(self.reader, self.posts[0])
+
+    def move(self, set_author_shard=sharding.set_author_shard):
+        with mock.patch(
+                'posts.sharding.set_author_shard',
+                side_effect=set_author_shard):
+            call_command(
+                'rebalance_shards', 'auth', '--to', 'shard_1',
+                '--batch-size', '2', stdout=StringIO(), stderr=StringIO())
+
+    def test_author_rows_move(self):
+        """Посты, комментарии и лайки автора переезжают в новый шард"""
+        self.move()
+        self.assertEqual(shard_for_author(self.user.pk), 'shard_1')
+        for model in (Post, Comment):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(model.objects.using('shard_1').count(), 3)
+                self.assertFalse(model.objects.using('shard_0').exists())
+        cache.clear()
+        post = Post.objects.using('shard_1').get(pk=self.posts[0].pk)
+        self.assertEqual(likes.like_counts([post])[post.pk], 1)
+
+    def test_rows_written_during_move_kept(self):
+        """Пост, записанный в старый шард во время переноса, не удаляется"""
+        def write_then_switch(author_id, alias):
+            Post.objects.using('shard_0').create(
+                author=self.user, text='Во время переноса')
+            set_author_shard(author_id, alias)
+
+        set_author_shard = sharding.set_author_shard
+        self.move(write_then_switch)
+        self.assertEqual(
+            list(Post.objects.using('shard_0').values_list(
+                'text', flat=True)),
+            ['Во время переноса']
+        )
+        self.assertEqual(Post.objects.using('shard_1').count(), 3)
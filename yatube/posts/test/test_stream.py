@@ -0,0 +1,95 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts import notify
+from posts.models import Follow, Post
+from posts.pagination import encode_cursor
+
+User = get_user_model()
+
+
+@override_settings(NEWPOSTS_SOCKET_DIR=None, NEWPOSTS_POLL_TIMEOUT=0)
+class NewPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.first = Post.objects.create(text='Первый', author=cls.author)
+        cls.cursor = encode_cursor(cls.first.pub_date, cls.first.pk)
+        Post.objects.create(text='Второй', author=cls.author)
+        Post.objects.create(text='Чужой', author=cls.reader)
+        cls.url = reverse('posts:new_posts')
+
+    def setUp(self):
+        self.client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_long_poll_counts(self):
+        """Long-poll отвечает числом постов после курсора."""
+        response = self.reader_client.get(
+            self.url, {'cursor': self.cursor})
+        self.assertEqual(response.json(), {'count': 2})
+        response = self.reader_client.get(
+            self.url, {'cursor': self.cursor, 'feed': 'follow'})
+        self.assertEqual(response.json(), {'count': 1})
+
+    def test_bad_requests(self):
+        """Без курсора - 400, лента подписок гостю - 401."""
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        response = self.client.get(
+            self.url, {'cursor': self.cursor, 'feed': 'follow'})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(NEWPOSTS_STREAM_TIMEOUT=0)
+    def test_event_stream(self):
+        """SSE присылает событие с числом новых постов."""
+        response = self.client.get(
+            self.url, {'cursor': self.cursor},
+            HTTP_ACCEPT='text/event-stream'
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = ''.join(
+            chunk.decode() for chunk in response.streaming_content)
+        self.assertIn('event: posts\ndata: {"count": 2}\n\n', body)
+
+    def test_index_shows_banner(self):
+        """Первая страница ленты содержит плашку новых постов."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'data-new-posts')
+
+
+class NotifyTest(SimpleTestCase):
+    def test_wait_wakes_on_publish(self):
+        """Ожидание заканчивается, как только пост опубликован."""
+        seen = notify.generation()
+        timer = threading.Timer(0.05, notify.wake)
+        timer.start()
+        self.assertNotEqual(notify.wait(seen, 5), seen)
+        timer.join()
+
+    def test_publish_reaches_other_sockets(self):
+        """Публикация шлёт датаграмму в сокеты других процессов."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        other = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(other.close)
+        other.bind(os.path.join(directory, '1.sock'))
+        stale = os.path.join(directory, '2.sock')
+        dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        dead.bind(stale)
+        dead.close()
+        with override_settings(NEWPOSTS_SOCKET_DIR=directory):
+            notify.publish()
+        other.settimeout(1)
+        self.assertEqual(other.recv(16), b'1')
+        self.assertFalse(os.path.exists(stale))
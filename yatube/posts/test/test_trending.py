@@ -0,0 +1,65 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import trending
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(TRENDING_WINDOW=600, TRENDING_BUCKET=60)
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое поле'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_sum_over_window(self):
+        """Веса складываются по корзинам окна"""
+        now = time.time()
+        trending.record('posts', 1, now=now)
+        trending.record('posts', 1, now=now - 120)
+        trending.record('posts', 2, now=now - 60)
+        self.assertEqual(
+            trending.top('posts', 5, now=now), [(1, 2), (2, 1)])
+
+    def test_members_of_one_bucket_kept(self):
+        """Все новые участники корзины учитываются, а не последний"""
+        now = time.time()
+        for item_id in range(1, 6):
+            trending.record('posts', item_id, weight=item_id, now=now)
+        self.assertEqual(
+            sorted(trending.scores('posts', now=now).items()),
+            [(1, 1), (2, 2), (3, 3), (4, 4), (5, 5)]
+        )
+
+    def test_old_buckets_leave_window(self):
+        """Корзины старше окна не учитываются"""
+        now = time.time()
+        trending.record('posts', 1, weight=5, now=now - 3600)
+        trending.record('posts', 2, now=now)
+        self.assertEqual(trending.top('posts', 5, now=now), [(2, 1)])
+
+    def test_index_sidebar(self):
+        """Новые посты и комментарии попадают в боковую панель"""
+        post = Post.objects.create(
+            text='Обсуждаемый пост', author=self.user, group=self.group)
+        Comment.objects.create(post=post, author=self.user, text='Да')
+        response = Client().get(reverse('posts:index'))
+        sidebar = response.context['trending']
+        self.assertEqual(sidebar['posts'][0][1], 'Обсуждаемый пост')
+        self.assertEqual(sidebar['groups'][0][1], self.group.title)
+        self.assertEqual(sidebar['groups'][0][2], 4)
+        self.assertEqual(sidebar['authors'][0][1], 'auth')
@@ -1,11 +1,16 @@
+from datetime import timedelta
+
 from django import forms
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.core.cache import cache
+from django.utils import timezone
 
 from yatube.settings import POSTS_ON_PAGE
-from posts.models import Group, Post, Follow
+from posts import likes
+from posts.models import Comment, Group, Post, Follow
+from posts.pagination import encode_cursor
 
 User = get_user_model()
 
@@ -282,3 +287,185 @@ class FollowViewsTest(TestCase):
         response_author = self.authorized_client.get(reverse(
             'posts:follow_index'))
         self.assertNotIn(new_post, response_author.context['page_obj'])
+
+
+@override_settings(COMMENTS_ON_PAGE=10)
+class CommentsPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.user
+        )
+        for i in range(15):
+            Comment.objects.create(
+                post=cls.post,
+                author=cls.user,
+                text=f'Комментарий {i}'
+            )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_first_page_inline(self):
+        """На странице поста выводится только первая порция комментариев"""
+        response = self.guest_client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id}))
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 10)
+        self.assertEqual(comments[0].text, 'Комментарий 0')
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_next_page_by_cursor(self):
+        """Следующая порция отдаётся отдельным фрагментом по курсору"""
+        response = self.guest_client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id}))
+        cursor = response.context['next_cursor']
+        response = self.guest_client.get(reverse(
+            'posts:post_comments', kwargs={'post_id': self.post.id}),
+            {'cursor': cursor})
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            [f'Комментарий {i}' for i in range(10, 15)]
+        )
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertTemplateNotUsed(response, 'base.html')
+
+
+class ProfileSummaryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(POSTS_ON_PAGE + 3)
+        ])
+        Follow.objects.create(user=cls.follower, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:profile', args=[self.user.username])
+
+    def test_profile_queries(self):
+        """Профиль собирается двумя запросами."""
+        with self.assertNumQueries(2):
+            response = Client().get(self.url)
+        author = response.context['author']
+        self.assertEqual(response.context['count_posts'], POSTS_ON_PAGE + 3)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(author.following_count, 0)
+        self.assertFalse(response.context['following'])
+        self.assertEqual(
+            response.context['page_obj'].paginator.count, POSTS_ON_PAGE + 3)
+
+    def test_profile_queries_with_likes(self):
+        """Лайки постов не добавляют запросов к профилю."""
+        post = Post.objects.filter(author=self.user).first()
+        likes.like(self.follower, post)
+        cache.clear()
+        with self.assertNumQueries(2):
+            Client().get(self.url)
+
+    def test_profile_following(self):
+        """Подписчик видит, что подписан на автора."""
+        client = Client()
+        client.force_login(self.follower)
+        response = client.get(self.url)
+        self.assertTrue(response.context['following'])
+
+    def test_post_detail_count(self):
+        """Страница поста берёт число постов автора из сводки."""
+        post = Post.objects.filter(author=self.user).first()
+        response = Client().get(reverse('posts:post_detail', args=[post.pk]))
+        self.assertEqual(response.context['count_posts'], POSTS_ON_PAGE + 3)
+
+
+class FeedCardsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        start = timezone.now()
+        posts = Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(POSTS_ON_PAGE + 5)
+        ])
+        for i, post in enumerate(posts):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=start - timedelta(minutes=i))
+        cls.posts = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        Follow.objects.create(user=User.objects.create_user(
+            username='follower'), author=self.user)
+
+    def test_pages_link_to_cards(self):
+        """Полные страницы ссылаются на подгрузку после своих постов."""
+        cursor = encode_cursor(
+            self.posts[POSTS_ON_PAGE - 1].pub_date,
+            self.posts[POSTS_ON_PAGE - 1].pk
+        )
+        pages = {
+            reverse('posts:index'): reverse('posts:index_cards'),
+            reverse('posts:group_list', args=[self.group.slug]):
+                reverse('posts:group_cards', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]):
+                reverse('posts:profile_cards', args=[self.user.username]),
+        }
+        for page, cards in pages.items():
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertContains(response, f'{cards}?cursor={cursor}')
+
+    def test_cards(self):
+        """Подгрузка отдаёт только карточки и курсор следующей порции."""
+        urls = (
+            reverse('posts:index_cards'),
+            reverse('posts:group_cards', args=[self.group.slug]),
+            reverse('posts:profile_cards', args=[self.user.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTemplateUsed(
+                    response, 'posts/includes/post_cards.html')
+                self.assertTemplateNotUsed(response, 'base.html')
+                self.assertEqual(
+                    list(response.context['posts']),
+                    self.posts[:POSTS_ON_PAGE]
+                )
+                cursor = response['X-Next-Cursor']
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(
+                    list(response.context['posts']),
+                    self.posts[POSTS_ON_PAGE:]
+                )
+                self.assertNotIn('X-Next-Cursor', response)
+
+    def test_follow_cards(self):
+        """Подгрузка ленты подписок доступна только авторизованным."""
+        url = reverse('posts:follow_cards')
+        self.assertEqual(Client().get(url).status_code, 302)
+        follower = Client()
+        follower.force_login(User.objects.get(username='follower'))
+        response = follower.get(url)
+        self.assertEqual(
+            list(response.context['posts']), self.posts[:POSTS_ON_PAGE])
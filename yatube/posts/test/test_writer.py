@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post
+from posts.writer import WriteQueue
+
+User = get_user_model()
+
+
+class WriteQueueTest(TestCase):
+    def setUp(self):
+        self.writer = WriteQueue(delay=0.05, batch_size=10)
+
+    def test_batch_returns_results(self):
+        """Каждый вызывающий получает свой результат после коммита"""
+        futures = [self.writer.submit(pow, i, 2) for i in range(5)]
+        self.assertEqual(
+            [future.result(timeout=5) for future in futures],
+            [0, 1, 4, 9, 16]
+        )
+
+    def test_error_does_not_break_batch(self):
+        """Ошибка в одной записи не мешает остальным в пачке"""
+        failed = self.writer.submit(int, 'не число')
+        done = self.writer.submit(int, '42')
+        with self.assertRaises(ValueError):
+            failed.result(timeout=5)
+        self.assertEqual(done.result(timeout=5), 42)
+
+
+class WriteQueueDatabaseTest(TransactionTestCase):
+    """Писатель работает со своим соединением, поэтому без TestCase."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.other = User.objects.create_user(username='other')
+        self.post = Post.objects.create(text='Пост', author=self.author)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_failed_write_rolls_back_alone(self):
+        """Нарушение уникальности откатывает только свою запись"""
+        Follow.objects.create(user=self.user, author=self.author)
+        writer = WriteQueue(delay=0.2, batch_size=10)
+        failed = writer.submit(
+            Follow.objects.create, user=self.user, author=self.author)
+        done = writer.submit(
+            Follow.objects.create, user=self.user, author=self.other)
+        with self.assertRaises(IntegrityError):
+            failed.result(timeout=5)
+        done.result(timeout=5)
+        self.assertEqual(
+            set(Follow.objects.values_list('author__username', flat=True)),
+            {'author', 'other'}
+        )
+
+    @override_settings(WRITE_QUEUE_ENABLED=True)
+    def test_views_write_before_redirect(self):
+        """Комментарий и подписка записаны, когда вернулся редирект"""
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Через очередь'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(
+            Comment.objects.filter(text='Через очередь').exists())
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username]))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Follow.objects.filter(
+            user=self.user, author=self.author).exists())
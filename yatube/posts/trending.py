@@ -0,0 +1,137 @@
+import heapq
+import time
+from collections import Counter
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from .models import Group
+from .sharding import post_querysets
+
+User = get_user_model()
+
+BUCKET_KEY = 'trending:{}:{}'
+SIZE_KEY = BUCKET_KEY + ':size'
+SLOT_KEY = BUCKET_KEY + ':slot:{}'
+TOP_KEY = 'trending:{}:top'
+KINDS = ('posts', 'groups', 'authors')
+
+COMMENT_WEIGHT = 1
+POST_WEIGHT = 3
+FOLLOW_WEIGHT = 1
+
+
+def bucket_number(now):
+    return int(now // settings.TRENDING_BUCKET)
+
+
+def record(kind, item_id, weight=1, now=None):
+    """Добавляет вес в счётчик текущей корзины.
+
+    Счётчик меняется атомарным incr. При первом появлении элемента
+    в корзине он получает свой номер из атомарного счётчика участников
+    и записывается в свой ключ, так что одновременные записи не
+    затирают друг друга. Корзины истекают из кэша сами, когда выходят
+    из окна.
+    """
+    now = time.time() if now is None else now
+    number = bucket_number(now)
+    counter_key = f'{BUCKET_KEY.format(kind, number)}:{item_id}'
+    timeout = settings.TRENDING_WINDOW + settings.TRENDING_BUCKET
+    if cache.add(counter_key, weight, timeout):
+        size_key = SIZE_KEY.format(kind, number)
+        cache.add(size_key, 0, timeout)
+        slot = cache.incr(size_key)
+        cache.set(SLOT_KEY.format(kind, number, slot), item_id, timeout)
+        return
+    try:
+        cache.incr(counter_key, weight)
+    except ValueError:
+        cache.add(counter_key, weight, timeout)
+
+
+def scores(kind, now=None):
+    now = time.time() if now is None else now
+    current = bucket_number(now)
+    count = settings.TRENDING_WINDOW // settings.TRENDING_BUCKET
+    numbers = range(current - count + 1, current + 1)
+    sizes = cache.get_many(
+        [SIZE_KEY.format(kind, number) for number in numbers])
+    slots = {
+        SLOT_KEY.format(kind, number, slot): number
+        for number in numbers
+        for slot in range(
+            1, sizes.get(SIZE_KEY.format(kind, number), 0) + 1)
+    }
+    counter_keys = [
+        f'{BUCKET_KEY.format(kind, slots[key])}:{item_id}'
+        for key, item_id in cache.get_many(list(slots)).items()
+    ]
+    totals = Counter()
+    for key, value in cache.get_many(counter_keys).items():
+        totals[int(key.rsplit(':', 1)[1])] += value
+    return totals
+
+
+def top(kind, size, now=None):
+    return heapq.nlargest(size, scores(kind, now).items(), key=itemgetter(1))
+
+
+def post_labels(ids):
+    labels = {}
+    for queryset in post_querysets(pk__in=ids):
+        for pk, text in queryset.values_list('pk', 'text'):
+            labels[pk] = (
+                reverse('posts:post_detail', args=[pk]),
+                Truncator(text).chars(40)
+            )
+    return labels
+
+
+def group_labels(ids):
+    return {
+        pk: (reverse('posts:group_list', args=[slug]), title)
+        for pk, slug, title in Group.objects.filter(
+            pk__in=ids).values_list('pk', 'slug', 'title')
+    }
+
+
+def author_labels(ids):
+    return {
+        user.pk: (
+            reverse('posts:profile', args=[user.username]),
+            user.get_full_name() or user.username
+        )
+        for user in User.objects.filter(pk__in=ids).only(
+            'pk', 'username', 'first_name', 'last_name')
+    }
+
+
+LABELS = {
+    'posts': post_labels,
+    'groups': group_labels,
+    'authors': author_labels,
+}
+
+
+def trending(kind):
+    """Топ раздела в виде (url, подпись, вес), пересчёт раз в REFRESH."""
+    key = TOP_KEY.format(kind)
+    result = cache.get(key)
+    if result is None:
+        ranked = top(kind, settings.TRENDING_SIZE)
+        labels = LABELS[kind]([item_id for item_id, _ in ranked])
+        result = [
+            labels[item_id] + (score,)
+            for item_id, score in ranked if item_id in labels
+        ]
+        cache.set(key, result, settings.TRENDING_REFRESH)
+    return result
+
+
+def sidebar():
+    return {kind: trending(kind) for kind in KINDS}
@@ -1,19 +1,38 @@
 from django.urls import path
 
-from . import views
+from . import api, stream, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('cards/', views.index_cards, name='index_cards'),
+    path('new/', stream.new_posts, name='new_posts'),
+    path('groups/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:slug>/cards/', views.group_cards, name='group_cards'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/cards/',
+        views.profile_cards,
+        name='profile_cards'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'),
+    path('posts/<int:post_id>/like/', views.like_post, name='like_post'),
+    path(
+        'posts/<int:post_id>/unlike/', views.unlike_post, name='unlike_post'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/cards/', views.follow_cards, name='follow_cards'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -24,4 +43,13 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('api/posts/', api.api_index, name='api_index'),
+    path('api/posts/<int:post_id>/', api.api_post, name='api_post'),
+    path('api/group/<slug:slug>/', api.api_group, name='api_group'),
+    path(
+        'api/profile/<str:username>/',
+        api.api_profile,
+        name='api_profile'
+    ),
+    path('api/follow/', api.api_follow, name='api_follow'),
 ]
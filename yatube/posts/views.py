@@ -1,32 +1,135 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.db.models import (BooleanField, Count, Exists, F, IntegerField,
+                              OuterRef, Subquery, Value)
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
-from yatube.settings import POSTS_ON_PAGE
+from yatube.settings import POSTS_ON_PAGE, SUGGESTIONS_ON_PAGE
 
+from . import likes, trending
+from .archive import archive_enabled, archived_posts
+from .conditional import conditional_page, group_changed_at, post_changed_at
+from .follow_graph import get_graph
 from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Follow
+from .models import Follow, Group, Post, Recommendation, User
+from .pagination import comment_page, cursor_page
+from .sharding import (TieredPostList, followed_post_querysets,
+                       followed_posts, get_post_or_404, is_sharded,
+                       post_list, post_querysets, shard_for_author,
+                       with_related)
+from .writer import write
 
 
-def paginator(posts, post_count, request):
+def paginator(posts, post_count, request, count=None):
     page = Paginator(posts, post_count)
+    if count is not None:
+        page.count = count
     page_number = request.GET.get('page')
     page_obj = page.get_page(page_number)
     return page_obj
 
 
+def suggested_authors(user):
+    graph = get_graph()
+    recommendations = Recommendation.objects.filter(
+        user=user).select_related('author')[:SUGGESTIONS_ON_PAGE]
+    return [
+        recommendation.author for recommendation in recommendations
+        if not graph.follows(user.pk, recommendation.author_id)
+    ]
+
+
+def count_subquery(queryset, field):
+    counts = queryset.order_by().values(field).annotate(
+        count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def author_summary(viewer, deleted=False, **lookup):
+    """Автор со счётчиками постов и подписок одним запросом.
+
+    В шардированной схеме посты лежат в другой базе, и их число
+    считается отдельным запросом в шард автора. Так же отдельно
+    досчитываются посты из архива. Мягко удалённые пользователи
+    находятся только с deleted=True: их посты видны до чистки.
+    """
+    if viewer.is_authenticated:
+        is_following = Exists(Follow.objects.filter(
+            user_id=viewer.pk, author=OuterRef('pk')))
+    else:
+        is_following = Value(False, output_field=BooleanField())
+    authors = User.objects.annotate(
+        followers_count=count_subquery(
+            Follow.objects.filter(author=OuterRef('pk')), 'author'),
+        following_count=count_subquery(
+            Follow.objects.filter(user=OuterRef('pk')), 'user'),
+        is_following=is_following,
+        changed_at=F('marker__changed_at'),
+    )
+    if not is_sharded():
+        authors = authors.annotate(posts_count=count_subquery(
+            Post.objects.filter(author=OuterRef('pk')), 'author'))
+    if not deleted:
+        authors = authors.filter(deletion_request__isnull=True)
+    author = get_object_or_404(authors, **lookup)
+    if is_sharded():
+        author.posts_count = Post.objects.using(
+            shard_for_author(author.pk)).filter(author=author).count()
+    if archive_enabled():
+        author.posts_count += archived_posts(author_id=author.pk).count()
+    return author
+
+
+def profile_changed_at(request, username):
+    """Сводка автора нужна и для ETag, и для страницы: берём её раз."""
+    request.author_summary = author_summary(request.user, username=username)
+    return request.author_summary.changed_at
+
+
+def cards_response(request, querysets, show_likes=False):
+    """Только карточки постов после курсора, без обвязки страницы.
+
+    Лайки показывают только ленты без ETag: отметки профиля и группы
+    от лайков не меняются.
+    """
+    posts, next_cursor = cursor_page(
+        [with_related(queryset, 'author', 'group') for queryset in querysets],
+        request.GET.get('cursor'),
+        POSTS_ON_PAGE
+    )
+    if show_likes:
+        posts = likes.attach_like_counts(posts)
+    context = {
+        'posts': posts,
+        'next_cursor': next_cursor,
+        'show_likes': show_likes
+    }
+    response = render(request, 'posts/includes/post_cards.html', context)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+
 def index(request):
-    post_list = Post.objects.all()
-    page_obj = paginator(post_list, POSTS_ON_PAGE, request)
+    posts = post_list()
+    page_obj = paginator(posts, POSTS_ON_PAGE, request)
     context = {
         'page_obj': page_obj,
+        'trending': trending.sidebar(),
     }
     return render(request, 'posts/index.html', context)
 
 
+def index_cards(request):
+    return cards_response(request, post_querysets(), show_likes=True)
+
+
+@conditional_page(group_changed_at)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = post_list(group=group)
     page_obj = paginator(posts, POSTS_ON_PAGE, request)
     context = {
         'group': group,
@@ -35,41 +138,87 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+def group_cards(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return cards_response(request, post_querysets(group_id=group.pk))
+
+
+def group_index(request):
+    groups = Group.objects.filter(
+        deletion_request__isnull=True
+    ).select_related('stats').order_by(
+        F('stats__last_post').desc(nulls_last=True), 'title')
+    context = {
+        'groups': groups
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
+@conditional_page(profile_changed_at)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    page_obj = paginator(posts, POSTS_ON_PAGE, request)
-    count_posts = posts.count()
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user, author=author).exists()
-    else:
-        following = False
+    author = getattr(request, 'author_summary', None)
+    if author is None:
+        author = author_summary(request.user, username=username)
+    posts = with_related(author.posts.all(), 'group')
+    if archive_enabled():
+        posts = TieredPostList(posts, with_related(
+            archived_posts(author_id=author.pk), 'group'))
+    page_obj = paginator(
+        posts, POSTS_ON_PAGE, request, count=author.posts_count)
     context = {
         'page_obj': page_obj,
-        'count_posts': count_posts,
+        'count_posts': author.posts_count,
         'author': author,
-        'following': following
+        'following': author.is_following
     }
+    if request.user == author:
+        context['suggestions'] = suggested_authors(author)
     return render(request, 'posts/profile.html', context)
 
 
+def profile_cards(request, username):
+    author = get_object_or_404(User, username=username)
+    querysets = post_querysets(
+        [shard_for_author(author.pk)], author_id=author.pk)
+    return cards_response(request, querysets)
+
+
+@conditional_page(post_changed_at)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    author = post.author
-    count_posts = author.posts.count()
+    post = get_post_or_404(post_id, archived=True)
+    author = author_summary(
+        request.user, deleted=True, pk=post.author_id)
+    post.author = author
+    likes.attach_like_counts([post], fresh=True)
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments, next_cursor = comment_page(post)
     context = {
-        'count_posts': count_posts,
+        'count_posts': author.posts_count,
         'author': author,
         'post': post,
+        'liked': likes.is_liked(request.user, post),
         'comments': comments,
+        'next_cursor': next_cursor,
         'form': form
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    post = get_post_or_404(post_id, archived=True)
+    comments, next_cursor = comment_page(post, request.GET.get('cursor'))
+    context = {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor
+    }
+    response = render(
+        request, 'posts/includes/comment_list.html', context)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
@@ -87,7 +236,7 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_404(post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(
@@ -107,31 +256,55 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_404(post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        write(comment.save, using=post._state.db)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def like_post(request, post_id):
+    post = get_post_or_404(post_id)
+    write(likes.like, request.user, post, using=post._state.db)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def unlike_post(request, post_id):
+    post = get_post_or_404(post_id)
+    write(likes.unlike, request.user, post, using=post._state.db)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = followed_posts(request.user)
     page_obj = paginator(posts, POSTS_ON_PAGE, request)
     context = {
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'suggestions': suggested_authors(request.user)
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def follow_cards(request):
+    return cards_response(
+        request, followed_post_querysets(request.user), show_likes=True)
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        Follow.objects.get_or_create(
+        write(
+            Follow.objects.get_or_create,
             user=request.user,
             author=author
         )
@@ -141,5 +314,5 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    write(Follow.objects.filter(user=request.user, author=author).delete)
     return redirect('posts:profile', username=username)
@@ -0,0 +1,102 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, transaction
+
+
+class WriteQueue:
+    """Очередь мелких записей с одним потоком-писателем.
+
+    Писатель забирает задания пачкой, пока не истечёт delay или не
+    наберётся batch_size, и коммитит их одной транзакцией на базу.
+    Каждое задание выполняется в своей точке сохранения, так что ошибка
+    одного не откатывает остальные.
+    """
+
+    def __init__(self, delay, batch_size):
+        self.delay = delay
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+        self.start()
+        future = Future()
+        self.queue.put((using, func, args, kwargs, future))
+        return future
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='posts-writer', daemon=True)
+                self.thread.start()
+
+    def collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.delay
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            close_old_connections()
+            for using in {item[0] for item in batch}:
+                self.commit(
+                    [item for item in batch if item[0] == using], using)
+
+    def commit(self, items, using):
+        results = []
+        try:
+            with transaction.atomic(using=using):
+                for _, func, args, kwargs, future in items:
+                    try:
+                        with transaction.atomic(using=using):
+                            result = func(*args, **kwargs)
+                    except Exception as error:
+                        results.append((future, None, error))
+                    else:
+                        results.append((future, result, None))
+        except Exception as error:
+            for *_, future in items:
+                future.set_exception(error)
+            return
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_writer = None
+_writer_pid = None
+
+
+def get_writer():
+    global _writer, _writer_pid
+    if _writer is None or _writer_pid != os.getpid():
+        _writer = WriteQueue(
+            settings.WRITE_QUEUE_DELAY, settings.WRITE_QUEUE_BATCH_SIZE)
+        _writer_pid = os.getpid()
+    return _writer
+
+
+def write(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Выполняет запись сразу или через очередь и ждёт коммита."""
+    if not settings.WRITE_QUEUE_ENABLED:
+        return func(*args, **kwargs)
+    future = get_writer().submit(func, *args, using=using, **kwargs)
+    return future.result(timeout=settings.WRITE_QUEUE_TIMEOUT)
@@ -0,0 +1,59 @@
+// Ссылка с атрибутом data-load-more подгружает следующую порцию
+// и заменяется ею. Порция сама содержит ссылку на следующую.
+// Ссылки с data-load-more="auto" срабатывают сами, когда видны
+// на экране; после первой подгрузки номера страниц скрываются.
+function loadMore(link) {
+  if (link.dataset.loading) {
+    return;
+  }
+  link.dataset.loading = '1';
+  fetch(link.href, {credentials: 'same-origin'})
+    .then(function (response) {
+      return response.text();
+    })
+    .then(function (html) {
+      var container = link.parentNode;
+      link.outerHTML = html;
+      var pagination = container.querySelector('.pagination');
+      if (pagination) {
+        pagination.closest('nav').hidden = true;
+      }
+      observeLinks(container);
+    })
+    .catch(function () {
+      delete link.dataset.loading;
+    });
+}
+
+var observer = 'IntersectionObserver' in window
+  ? new IntersectionObserver(function (entries) {
+      entries.forEach(function (entry) {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          loadMore(entry.target);
+        }
+      });
+    }, {rootMargin: '400px'})
+  : null;
+
+function observeLinks(root) {
+  if (!observer) {
+    return;
+  }
+  root.querySelectorAll('[data-load-more="auto"]').forEach(function (link) {
+    observer.observe(link);
+  });
+}
+
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-load-more]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  loadMore(link);
+});
+
+document.addEventListener('DOMContentLoaded', function () {
+  observeLinks(document);
+});
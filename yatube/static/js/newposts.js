@@ -0,0 +1,48 @@
+// Плашка data-new-posts показывает, сколько постов вышло после
+// первого на странице. Число приходит потоком EventSource, а без
+// него - длинным опросом: сервер держит запрос, пока число не
+// изменится.
+function showNewPosts(banner, count) {
+  if (!count) {
+    return;
+  }
+  banner.querySelector('[data-count]').textContent = count;
+  banner.hidden = false;
+}
+
+function pollNewPosts(banner, seen) {
+  fetch(banner.dataset.newPosts + '&seen=' + seen, {
+    credentials: 'same-origin',
+    headers: {Accept: 'application/json'}
+  })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.status);
+      }
+      return response.json();
+    })
+    .then(function (data) {
+      showNewPosts(banner, data.count);
+      pollNewPosts(banner, data.count);
+    })
+    .catch(function () {
+      setTimeout(function () {
+        pollNewPosts(banner, seen);
+      }, 30000);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+  var banner = document.querySelector('[data-new-posts]');
+  if (!banner) {
+    return;
+  }
+  if (!('EventSource' in window)) {
+    pollNewPosts(banner, 0);
+    return;
+  }
+  var source = new EventSource(banner.dataset.newPosts);
+  source.addEventListener('posts', function (event) {
+    showNewPosts(banner, JSON.parse(event.data).count);
+  });
+});
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts.deletion import request_deletion
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    actions = ('soft_delete',)
+
+    def soft_delete(self, request, queryset):
+        for user in queryset:
+            request_deletion(user)
+        self.message_user(
+            request, 'Данные пользователей будут удалены командой '
+                     'purge_deleted')
+    soft_delete.short_description = 'Удалить в фоне'
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
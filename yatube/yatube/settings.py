@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -24,7 +25,8 @@ ALLOWED_HOSTS = [
 
 INSTALLED_APPS = [
     'posts.apps.PostsConfig',
-    'django.contrib.admin',
+    # Admin modules are discovered in urls.py, not at startup.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -41,7 +43,9 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'core.middleware.AdmissionControlMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -67,6 +71,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# Warm up templates, URLs, sorl and the database in wsgi.py and freeze the
+# heap before the server forks workers. Needs a preloading server, for
+# example gunicorn --preload.
+WSGI_WARMUP = not DEBUG
 
 
 # Database
@@ -79,6 +87,31 @@ DATABASES = {
     }
 }
 
+# Aliases from DATABASES that hold posts and comments, sharded by author.
+# Empty list keeps everything in the default database.
+POSTS_SHARDS = []
+# Each process caches an author's shard for this many seconds, so after
+# rebalance_shards other workers switch to the new shard within it.
+POSTS_SHARD_CACHE_TIMEOUT = 60
+
+# Posts older than POSTS_ARCHIVE_AFTER days are moved to the archive tables
+# by the archive_posts command. None disables the archive. The archive can
+# live in its own database alias from DATABASES.
+POSTS_ARCHIVE_AFTER = None
+POSTS_ARCHIVE_DB = None
+
+DATABASE_ROUTERS = [
+    'posts.routers.ArchiveRouter',
+    'posts.routers.AuthorShardRouter',
+]
+
+# Comments and follows can be committed in group transactions by a single
+# writer thread per process instead of one transaction per request.
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_DELAY = 0.005
+WRITE_QUEUE_BATCH_SIZE = 100
+WRITE_QUEUE_TIMEOUT = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -120,19 +153,116 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# collectstatic writes content-hashed names and .gz copies next to them.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_ON_PAGE = 10
 
+COMMENTS_ON_PAGE = 20
+
+RECOMMENDATIONS_COUNT = 10
+SUGGESTIONS_ON_PAGE = 5
+
+GROUP_RECENT_AUTHORS = 5
+
+# Like counts are split into LIKE_COUNTER_SHARDS rows per post so that
+# concurrent likes of one post update different rows. Sums are cached.
+LIKE_COUNTER_SHARDS = 8
+LIKE_CACHE_TIMEOUT = 5 * 60
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# "New posts" notifications: waiting requests per process, long-poll hold
+# time, SSE stream lifetime and keep-alive interval, in seconds. Processes
+# wake each other through datagram sockets in NEWPOSTS_SOCKET_DIR; None
+# keeps notifications inside one process.
+NEWPOSTS_MAX_WAITERS = 100
+NEWPOSTS_POLL_TIMEOUT = 25
+NEWPOSTS_STREAM_TIMEOUT = 5 * 60
+NEWPOSTS_KEEPALIVE = 15
+NEWPOSTS_SOCKET_DIR = os.path.join(tempfile.gettempdir(), 'yatube-newposts')
+
+# Trending lists: per-minute counters in the cache over a sliding window.
+TRENDING_WINDOW = 60 * 60
+TRENDING_BUCKET = 60
+TRENDING_REFRESH = 30
+TRENDING_SIZE = 5
+
+# Memory-mapped snapshot of the follow graph shared by all workers.
+FOLLOW_GRAPH_PATH = os.path.join(BASE_DIR, 'follow_graph.bin')
+
+# Admission control: concurrent request limits per class of views
+# in one worker process, queueing deadline and stale copy lifetime.
+ADMISSION_LIMITS = {
+    'feeds': 4,
+}
+ADMISSION_VIEW_CLASSES = {
+    'posts:follow_index': 'feeds',
+    'posts:profile': 'feeds',
+    'posts:group_list': 'feeds',
+    'posts:follow_cards': 'feeds',
+    'posts:profile_cards': 'feeds',
+    'posts:group_cards': 'feeds',
+}
+ADMISSION_QUEUE_TIMEOUT = 2
+ADMISSION_RETRY_AFTER = 5
+ADMISSION_STALE_TIMEOUT = 5 * 60
+
+# Sessions live in the cache and are written through to the database;
+# the session user is cached for USER_CACHE_TIMEOUT seconds.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+USER_CACHE_TIMEOUT = 5 * 60
+
+# Token buckets per user (or per IP for anonymous visitors): 'N/period',
+# where period is one of s, m, h, d.
+RATELIMITS = {
+    'posts:post_create': '20/m',
+    'posts:add_comment': '10/m',
+    'posts:like_post': '60/m',
+    'posts:unlike_post': '60/m',
+    'posts:profile_follow': '30/m',
+    'posts:profile_unfollow': '30/m',
+    'users:signup': '10/m',
+}
+# Only writes are limited: GET/HEAD/OPTIONS pass, except for views that
+# change data on GET (the follow links).
+RATELIMIT_GET_VIEWS = {'posts:profile_follow', 'posts:profile_unfollow'}
+
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Background task queue stored in the database, see core.tasks.
+TASKS_WORKERS = 2
+TASKS_BATCH_SIZE = 100
+TASKS_IDLE_SLEEP = 0.5
+TASKS_LEASE = 5 * 60
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 10
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Folders of MEDIA_ROOT that serve_media may hand out: uploads and sorl
+# thumbnails.
+MEDIA_ALLOWED_PREFIXES = ('posts/', 'cache/')
+MEDIA_MAX_AGE = 60 * 60 * 24
+# None serves files from Python. 'x-accel-redirect' (nginx) or 'x-sendfile'
+# (Apache, lighttpd) leave the transfer to the front proxy; for nginx
+# MEDIA_ACCEL_PREFIX must be an internal location aliased to MEDIA_ROOT.
+MEDIA_OFFLOAD = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 CACHES = {
     'default': {
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import metrics, serve_media, serve_static
+
+admin.autodiscover()
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,13 +12,19 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics/', metrics, name='metrics'),
+    path(
+        f'{settings.STATIC_URL.strip("/")}/<path:path>',
+        serve_static,
+        name='static'
+    ),
+    path(
+        f'{settings.MEDIA_URL.strip("/")}/<path:path>',
+        serve_media,
+        name='media'
+    ),
 ]
 
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
 handler403 = 'core.views.permission_denied'
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
@@ -0,0 +1,85 @@
+"""Прогрев процесса до форка воркеров.
+
+Сервер с предзагрузкой приложения (gunicorn --preload, uwsgi без
+lazy-apps) вызывает wsgi.py один раз в мастере. Всё, что подготовлено
+здесь, воркеры получают готовым и делят с мастером копированием при
+записи.
+"""
+import gc
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.html'):
+                path = os.path.relpath(os.path.join(root, name), directory)
+                yield path.replace(os.sep, '/')
+
+
+def compile_templates():
+    """Компилирует шаблоны из templates/ в кэш загрузчика.
+
+    Кэширующий загрузчик включён при DEBUG = False, с отладкой
+    шаблоны всё равно читаются заново на каждый запрос.
+    """
+    total = 0
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for name in template_names(directory):
+            try:
+                get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                continue
+            total += 1
+    return total
+
+
+def build_resolver():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.namespace_dict
+    return resolver
+
+
+def load_thumbnail_engine():
+    """sorl создаёт движок, хранилище и kvstore при первой картинке."""
+    from sorl.thumbnail import default
+
+    for name in ('engine', 'backend', 'storage', 'kvstore'):
+        getattr(default, name).__class__
+
+
+def touch_database():
+    """Проверочный запрос и кэш типов содержимого, затем закрытие.
+
+    Соединения нельзя делить между процессами, поэтому мастер закрывает
+    их до форка, а воркеры откроют свои.
+    """
+    get_user_model()
+    try:
+        ContentType.objects.get_for_models(*apps.get_models())
+        for alias in connections:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+    except DatabaseError:
+        pass
+    finally:
+        connections.close_all()
+
+
+def run():
+    compile_templates()
+    build_resolver()
+    load_thumbnail_engine()
+    touch_database()
+    gc.collect()
+    gc.freeze()